@@ -1,11 +1,18 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Header, Request
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Header, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from typing import Optional, Dict, Any
+import asyncio
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+import functools
+import multiprocessing
 import tempfile
 import os
 import secrets
+import shutil
 try:
     import razorpay
 except ImportError:
@@ -14,35 +21,50 @@ except ImportError:
 
 import hmac
 import hashlib
+import json
+import logging
+import orjson
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
+from itsdangerous import BadSignature, TimestampSigner
 
 from database import Database
 
 load_dotenv()
 
+logger = logging.getLogger("armwrestle")
+
 # =========================
 # CONFIG
 # =========================
-ANALYSIS_MODE = "real"   # "mock" or "real"
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "real")   # "mock" or "real"
+REAL_AI_REQUESTED = ANALYSIS_MODE == "real"
 
-# Try to import video analyzer
-try:
-    from video_analyzer import analyze_armwrestling_video
-    HAS_REAL_AI = True
-    print("[OK] Real video analysis enabled")
-except ImportError as e:
-    print(f"[WARNING] Could not import video analyzer: {e}")
-    print("Falling back to mock analysis")
-    HAS_REAL_AI = False
-    ANALYSIS_MODE = "mock"
-    # Create dummy function for mock mode
-    def analyze_armwrestling_video(video_path):
-        return {"error": "Video analyzer not available"}
+# Try to import video analyzer (skipped in mock mode so OpenCV/MediaPipe
+# are never loaded there)
+HAS_REAL_AI = False
+if ANALYSIS_MODE == "real":
+    try:
+        from video_analyzer import analysis_settings, analyze_armwrestling_video, limit_decode_workers
+        HAS_REAL_AI = True
+        print("[OK] Real video analysis enabled")
+    except ImportError as e:
+        print(f"[WARNING] Could not import video analyzer: {e}")
+        print("Falling back to mock analysis")
+        ANALYSIS_MODE = "mock"
+else:
+    print("[INFO] ANALYSIS_MODE=mock - real video analysis disabled")
 
 # Razorpay Configuration
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "")
 RAZORPAY_WEBHOOK_SECRET = os.getenv("RAZORPAY_WEBHOOK_SECRET", "")
+_WEBHOOK_SECRET_BYTES = RAZORPAY_WEBHOOK_SECRET.encode()
+
+# Resolved once rather than inside every failed verification
+SIGNATURE_VERIFICATION_ERROR = getattr(
+    getattr(razorpay, "errors", None), "SignatureVerificationError", None
+)
 
 # Initialize Razorpay client
 razorpay_client = None
@@ -52,6 +74,40 @@ if razorpay and RAZORPAY_KEY_ID and RAZORPAY_KEY_SECRET:
     except Exception as e:
         print(f"[WARNING] Failed to initialize Razorpay: {e}")
 
+# Session token signing - set SECRET_KEY in production so tokens survive
+# restarts and verify on every worker
+SECRET_KEY = os.getenv("SECRET_KEY", "")
+if not SECRET_KEY:
+    SECRET_KEY = secrets.token_urlsafe(32)
+    print("[WARNING] SECRET_KEY not set - using a random key, sessions end on restart")
+TOKEN_MAX_AGE = 7 * 24 * 3600  # seconds
+
+# Upload streaming
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+ALLOWED_VIDEO_TYPES = frozenset({"video/mp4", "video/quicktime", "video/x-msvideo"})
+# RAM-backed tmpfs used for spooled uploads when they comfortably fit
+SHM_DIR = "/dev/shm"
+
+# Finished real analyses keyed by analyzer settings, upload content and
+# person_id. The pipeline is deterministic, so a repeated upload is served
+# from here instead of re-running pose inference. Bump the version when
+# analyzer output changes; least recently used files are deleted once the
+# directory outgrows ANALYSIS_CACHE_MAX_BYTES.
+ANALYSIS_CACHE_DIR = os.getenv(
+    "ANALYSIS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "armwrestle-analysis-cache")
+)
+ANALYSIS_CACHE_VERSION = 2
+ANALYSIS_CACHE_SIZE = 256  # in-process entries in front of the disk cache
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Worker processes for real analysis - keeps MediaPipe/OpenCV off the API
+# process's GIL and lets analyses run in parallel on multicore hosts
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Each analysis worker may start its own parallel-decode pool for long
+# videos; split the CPUs between them so the two pools together stay
+# within the host
+DECODE_WORKERS_PER_ANALYSIS = max(1, (os.cpu_count() or 1) // ANALYSIS_WORKERS)
+
 # Plan pricing (in paise - 1 rupee = 100 paise)
 PLAN_PRICES = {
     "pro": 69900,      # ₹699
@@ -61,7 +117,7 @@ PLAN_PRICES = {
 # =========================
 # APP INIT
 # =========================
-app = FastAPI(title="ArmWrestle AI API")
+app = FastAPI(title="ArmWrestle AI API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -72,107 +128,164 @@ app.add_middleware(
 )
 
 db = Database()
-active_sessions = {}
+
+# user_id -> user row, so authenticated requests skip the users lookup. Keyed
+# by user rather than token so every session of a user shares one entry.
+USER_CACHE_TTL = 60  # seconds
+_user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+
+# user_id -> dashboard payloads; polled often and fine to serve a few
+# seconds stale. Dropped whenever the user saves a new analysis.
+DASHBOARD_CACHE_TTL = 5  # seconds
+_stats_cache = TTLCache(maxsize=10_000, ttl=DASHBOARD_CACHE_TTL)
+_history_cache = TTLCache(maxsize=10_000, ttl=DASHBOARD_CACHE_TTL)
+
+# (content digest, person_id) -> orjson-encoded result; decoded per hit so
+# callers can't mutate the cached copy
+_analysis_result_cache = LRUCache(maxsize=ANALYSIS_CACHE_SIZE)
 
 # =========================
-# STATIC FILES (Frontend)
+# ANALYSIS WORKERS
 # =========================
-# Serve frontend files from root directory (for Railway deployment)
-# Try multiple possible paths where frontend might be located
-backend_dir = os.path.dirname(os.path.abspath(__file__))  # Directory where api.py is located
-project_root = os.path.dirname(backend_dir)  # Parent directory (project root)
-
-frontend_paths = [
-    project_root,  # Project root (where frontend/ folder is)
-    os.path.join(project_root, "frontend"),  # frontend/ subdirectory
-    os.path.join(backend_dir, ".."),  # One level up from backend
-    os.path.join(backend_dir, "..", "frontend"),  # frontend/ from backend
-    "../",  # Relative: one level up
-    "../frontend",  # Relative: frontend folder
-    "frontend",  # Same directory
-    ".",  # Current directory
-]
-
-frontend_dir = None
-for path in frontend_paths:
-    abs_path = os.path.abspath(path) if os.path.isabs(path) else os.path.abspath(os.path.join(backend_dir, path))
-    if os.path.exists(abs_path):
-        # Check if it contains index.html
-        index_path = os.path.join(abs_path, "index.html")
-        if os.path.exists(index_path):
-            frontend_dir = abs_path
-            print(f"[OK] Frontend found at: {frontend_dir}")
-            print(f"[DEBUG] Backend dir: {backend_dir}")
-            print(f"[DEBUG] Project root: {project_root}")
-            break
-
-if frontend_dir:
-    # Mount static files - this will serve frontend for all non-API routes
-    app.mount("/", StaticFiles(directory=frontend_dir, html=True), name="static")
-    print(f"[OK] Frontend files will be served from: {frontend_dir}")
-    print(f"[OK] API routes are available at /api/*")
-else:
-    print("[WARNING] Frontend directory not found. API-only mode.")
-    print(f"[DEBUG] Checked paths: {frontend_paths}")
-    print(f"[DEBUG] Current working directory: {os.getcwd()}")
-    print(f"[DEBUG] Backend directory: {backend_dir}")
-    print(f"[DEBUG] Project root: {project_root}")
-    if os.path.exists(backend_dir):
-        print(f"[DEBUG] Files in backend dir: {os.listdir(backend_dir)[:10]}")
-    if os.path.exists(project_root):
-        print(f"[DEBUG] Files in project root: {os.listdir(project_root)[:10]}")
+_analysis_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+# Digest of the workers' analysis_settings(), fetched on first use
+_analysis_settings_digest: Optional[str] = None
+
+def new_analysis_executor() -> concurrent.futures.ProcessPoolExecutor:
+    # spawn, not fork: the API process already runs threads
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=ANALYSIS_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=limit_decode_workers,
+        initargs=(DECODE_WORKERS_PER_ANALYSIS,)
+    )
+    print(f"[OK] Started {ANALYSIS_WORKERS} analysis worker processes")
+    return executor
+
+@app.on_event("startup")
+async def start_analysis_workers():
+    global _analysis_executor
+    if ANALYSIS_MODE == "real" and HAS_REAL_AI:
+        _analysis_executor = new_analysis_executor()
+
+async def run_in_analysis_worker(func, *args):
+    """Run func(*args) on the analysis worker pool
+    
+    A worker that dies (segfault, OOM kill) breaks the whole pool, so it is
+    replaced and the call retried once; a second failure raises a 503.
+    """
+    global _analysis_executor
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = _analysis_executor
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            logger.exception("[ERROR] Analysis worker pool broke (attempt %d)", attempt + 1)
+            # Concurrent requests see the same broken pool; only the first replaces it
+            if _analysis_executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                _analysis_executor = new_analysis_executor()
+    raise HTTPException(status_code=503, detail="Video analysis workers are unavailable, please try again")
+
+@app.on_event("shutdown")
+async def stop_analysis_workers():
+    if _analysis_executor:
+        _analysis_executor.shutdown(cancel_futures=True)
 
 # =========================
 # AUTH HELPERS
 # =========================
-def generate_token():
-    return secrets.token_urlsafe(32)
+# Tokens are the user id signed with SECRET_KEY, so any worker can verify
+# them without shared session storage
+_token_signer = TimestampSigner(SECRET_KEY)
 
-def get_user_from_token(token: str):
-    user_id = active_sessions.get(token)
-    if user_id:
-        return db.get_user(user_id)
-    return None
+def generate_token(user_id: int) -> str:
+    return _token_signer.sign(str(user_id)).decode()
+
+def extract_token(authorization: Optional[str]) -> Optional[str]:
+    """Token from a "Bearer <token>" Authorization header, None for any other scheme"""
+    return authorization[7:] if authorization and authorization.startswith("Bearer ") else None
+
+async def get_user_from_token(token: Optional[str]):
+    if not token:
+        return None
+    try:
+        user_id = int(_token_signer.unsign(token, max_age=TOKEN_MAX_AGE))
+    except (BadSignature, ValueError):
+        return None
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = await asyncio.to_thread(db.get_user, user_id)
+        if user:
+            _user_cache[user_id] = user
+    return user
+
+def invalidate_cached_user(user_id: int):
+    """Drop the cached row for a user whose record changed (e.g. plan upgrade)"""
+    _user_cache.pop(user_id, None)
+
+async def current_user(authorization: str = Header(...)) -> dict:
+    """Dependency resolving the Authorization header to a user or raising 401"""
+    user = await get_user_from_token(extract_token(authorization))
+    if not user:
+        raise HTTPException(401, "Unauthorized")
+    return user
 
 # =========================
 # MOCK ANALYSIS ENGINE
 # =========================
-def mock_analysis(video_name: str) -> Dict[str, Any]:
-    return {
-        "technique": {
-            "primary": "Top Roll",
-            "transitions": [
-                {"type": "Hook", "timestamp": 2.3}
-            ],
-            "description": "Top Roll detected with one transition"
-        },
-        "risks": [
-            {
-                "level": "medium",
-                "title": "Wrist Exposure",
-                "description": "Wrist opened slightly under pressure"
-            }
-        ],
-        "strength": {
-            "Back Pressure": "Strong (8.1/10)",
-            "Wrist Control": "Moderate (6.2/10)",
-            "Side Pressure": "Moderate (6/10)",
-            "summary": "Good back pressure, wrist endurance needs improvement"
+# Built once at import; mock_analysis hands out shallow copies, so callers
+# may add top-level keys but must not mutate the nested values
+_MOCK_RESULT = {
+    "technique": {
+        "primary": "Top Roll",
+        "transitions": (
+            {"type": "Hook", "timestamp": 2.3},
+        ),
+        "description": "Top Roll detected with one transition"
+    },
+    "risks": (
+        {
+            "level": "medium",
+            "title": "Wrist Exposure",
+            "description": "Wrist opened slightly under pressure"
         },
-        "recommendations": [
-            "Wrist curls (3x15)",
-            "Static wrist holds (4x30s)",
-            "Pronation training"
-        ],
-        "frames_analyzed": 0,
-        "duration": 0
-    }
+    ),
+    "strength": {
+        "Back Pressure": "Strong (8.1/10)",
+        "Wrist Control": "Moderate (6.2/10)",
+        "Side Pressure": "Moderate (6/10)",
+        "summary": "Good back pressure, wrist endurance needs improvement"
+    },
+    "recommendations": (
+        "Wrist curls (3x15)",
+        "Static wrist holds (4x30s)",
+        "Pronation training"
+    ),
+    "frames_analyzed": 0,
+    "duration": 0
+}
+
+# Mock /api/analyze response body, serialized once
+_MOCK_RESPONSE_JSON = orjson.dumps({"success": True, "data": _MOCK_RESULT})
+
+def mock_analysis(video_name: str) -> Dict[str, Any]:
+    return {**_MOCK_RESULT}
+
+def mock_response(analysis_id: Optional[int] = None) -> Response:
+    """Serve the pre-serialized mock response, adding analysis_id if saved"""
+    body = _MOCK_RESPONSE_JSON
+    if analysis_id is not None:
+        # Splice the id into "data" ahead of the two closing braces
+        body = body[:-2] + b',"analysis_id":%d}}' % analysis_id
+    return Response(body, media_type="application/json")
 
 # =========================
 # API ROOT
 # =========================
-# Note: Root route "/" is handled by StaticFiles mount above
-# This endpoint is only reached if static files aren't found
+# Note: Root route "/" is handled by the StaticFiles mount at the end of this
+# file, which only sees paths no API route matched
 @app.get("/api")
 async def api_root():
     return {
@@ -191,7 +304,20 @@ async def analysis_status():
     """Check if real analysis is available"""
     status = {
         "analysis_mode": ANALYSIS_MODE,
-        "has_real_ai": HAS_REAL_AI,
+        "has_real_ai": HAS_REAL_AI
+    }
+    if not REAL_AI_REQUESTED:
+        # Mock deployments never load OpenCV/MediaPipe - don't start here
+        status["dependencies_available"] = False
+        status["error"] = "Real analysis disabled (ANALYSIS_MODE=mock)"
+        return status
+    
+    return {**status, **await asyncio.to_thread(probe_analysis_dependencies)}
+
+@functools.lru_cache(maxsize=1)
+def probe_analysis_dependencies() -> Dict[str, Any]:
+    """Import-check the real analysis stack once (MediaPipe is slow to import)"""
+    status = {
         "dependencies_available": False,
         "error": None
     }
@@ -232,14 +358,13 @@ async def analysis_status():
 
 @app.post("/api/register")
 async def register(email: str = Form(...), name: str = Form(...)):
-    if db.get_user_by_email(email):
+    if await asyncio.to_thread(db.get_user_by_email, email):
         raise HTTPException(400, "Email already exists")
 
-    user_id = db.create_user(email, name)
-    token = generate_token()
-    active_sessions[token] = user_id
+    user_id = await asyncio.to_thread(db.create_user, email, name)
+    token = generate_token(user_id)
 
-    user = db.get_user(user_id)
+    user = await asyncio.to_thread(db.get_user, user_id)
 
     return {
         "success": True,
@@ -249,12 +374,11 @@ async def register(email: str = Form(...), name: str = Form(...)):
 
 @app.post("/api/login")
 async def login(email: str = Form(...)):
-    user = db.get_user_by_email(email)
+    user = await asyncio.to_thread(db.get_user_by_email, email)
     if not user:
         raise HTTPException(404, "User not found")
 
-    token = generate_token()
-    active_sessions[token] = user["id"]
+    token = generate_token(user["id"])
     db.log_action(user["id"], "login")
 
     return {
@@ -263,6 +387,160 @@ async def login(email: str = Form(...)):
         "user": user
     }
 
+def upload_temp_dir(size: Optional[int]) -> Optional[str]:
+    """/dev/shm when the upload fits with room to spare, else the default temp dir"""
+    if size and os.path.isdir(SHM_DIR) and shutil.disk_usage(SHM_DIR).free > 2 * size:
+        return SHM_DIR
+    return None
+
+def spool_and_hash(src, dst) -> str:
+    """Copy src to dst in UPLOAD_CHUNK_SIZE chunks; return the content's blake2b digest"""
+    digest = hashlib.blake2b(digest_size=16)
+    while chunk := src.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        dst.write(chunk)
+    return digest.hexdigest()
+
+async def analysis_settings_digest() -> str:
+    """Digest of the settings the analysis workers run with
+    
+    Asked of a worker rather than read here, since workers cap their decode
+    pool in the pool initializer.
+    """
+    global _analysis_settings_digest
+    if _analysis_settings_digest is None:
+        settings = await run_in_analysis_worker(analysis_settings)
+        _analysis_settings_digest = hashlib.blake2b(
+            orjson.dumps(settings, option=orjson.OPT_SORT_KEYS), digest_size=8
+        ).hexdigest()
+    return _analysis_settings_digest
+
+def analysis_cache_path(key: tuple) -> str:
+    settings_digest, content_digest, person_id = key
+    return os.path.join(
+        ANALYSIS_CACHE_DIR,
+        f"v{ANALYSIS_CACHE_VERSION}_{settings_digest}_{content_digest}_"
+        f"{'auto' if person_id is None else person_id}.json"
+    )
+
+def prune_analysis_cache():
+    """Delete least recently used cache files until the directory fits ANALYSIS_CACHE_MAX_BYTES"""
+    files = []
+    try:
+        with os.scandir(ANALYSIS_CACHE_DIR) as entries:
+            for entry in entries:
+                with contextlib.suppress(OSError):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in files)
+    # Oldest first; a cache hit refreshes its file's mtime
+    for _, size, path in sorted(files):
+        if total <= ANALYSIS_CACHE_MAX_BYTES:
+            break
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        total -= size
+
+def load_cached_analysis(key: tuple) -> Optional[Dict[str, Any]]:
+    """Result of an earlier analysis of the same video and person, if any"""
+    data = _analysis_result_cache.get(key)
+    if data is None:
+        path = analysis_cache_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # Mark the file recently used for prune_analysis_cache
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        _analysis_result_cache[key] = data
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # A damaged cache file just means re-running the analysis
+        _analysis_result_cache.pop(key, None)
+        return None
+
+def store_cached_analysis(key: tuple, results: Dict[str, Any]):
+    try:
+        data = orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY)
+    except TypeError as e:
+        print(f"[WARNING] Could not cache analysis: {e}")
+        return
+    _analysis_result_cache[key] = data
+    path = analysis_cache_path(key)
+    try:
+        os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+        # Write then rename, so other workers never read a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[WARNING] Could not write analysis cache: {e}")
+        return
+    prune_analysis_cache()
+
+async def run_real_analysis(video: UploadFile, person_id: Optional[int]) -> Dict[str, Any]:
+    """Spool the upload to disk and run the MediaPipe/OpenCV pipeline on it"""
+    # Copy the upload across in fixed-size chunks so peak memory stays at
+    # one chunk regardless of video size; the copy runs on a worker thread
+    # so disk I/O never stalls the event loop. The content is hashed on the
+    # way through for the result cache.
+    tmp = tempfile.NamedTemporaryFile(delete=False, dir=upload_temp_dir(video.size))
+    tmp_path = tmp.name
+    try:
+        with tmp:
+            content_digest = await asyncio.to_thread(spool_and_hash, video.file, tmp)
+    except BaseException:
+        # A partial spool left in /dev/shm would hold RAM until reboot
+        os.unlink(tmp_path)
+        raise
+
+    try:
+        cache_key = (await analysis_settings_digest(), content_digest, person_id)
+        cached = await asyncio.to_thread(load_cached_analysis, cache_key)
+        if cached is not None:
+            print(f"[ANALYSIS] Serving cached analysis for {content_digest} (person_id={person_id})")
+            return cached
+
+        # Real video analysis using MediaPipe and OpenCV
+        # person_id: 0 = left person, 1 = right person, None = auto-select first
+        print(f"[ANALYSIS] Starting real video analysis... (person_id={person_id})")
+        results = await run_in_analysis_worker(analyze_armwrestling_video, tmp_path, person_id)
+
+        # Check if analysis returned an error
+        if "error" in results:
+            # Fallback to mock if real analysis fails
+            error_msg = results.get('error', 'Unknown error')
+            print(f"[ERROR] Real analysis failed: {error_msg}, using mock")
+            results = mock_analysis(video.filename)
+            results["_fallback_reason"] = error_msg
+        else:
+            technique = results.get('technique', {}).get('primary', 'Unknown')
+            frames = results.get('frames_analyzed', 0)
+            print(f"[SUCCESS] Real analysis completed: {technique} (analyzed {frames} frames)")
+            # Add marker to show it's real analysis
+            results["_is_real_analysis"] = True
+            await asyncio.to_thread(store_cached_analysis, cache_key, results)
+    except HTTPException:
+        raise
+    except Exception as e:
+        # If real analysis crashes, fallback to mock
+        error_msg = str(e)
+        logger.exception("[ERROR] Real analysis exception: %s, falling back to mock", error_msg)
+        results = mock_analysis(video.filename)
+        results["_fallback_reason"] = f"Exception: {error_msg}"
+    finally:
+        # Clean up temporary file
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+
+    return results
+
 @app.post("/api/analyze")
 async def analyze(
     video: UploadFile = File(...),
@@ -271,94 +549,56 @@ async def analyze(
 ):
     user_id = None
 
-    if authorization and authorization.startswith("Bearer "):
-        token = authorization.split(" ")[1]
-        user = get_user_from_token(token)
-        if user:
-            user_id = user["id"]
+    user = await get_user_from_token(extract_token(authorization))
+    if user:
+        user_id = user["id"]
 
-    if video.content_type not in [
-        "video/mp4", "video/quicktime", "video/x-msvideo"
-    ]:
+    if video.content_type not in ALLOWED_VIDEO_TYPES:
         raise HTTPException(400, "Invalid video format")
 
-    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-        tmp.write(await video.read())
-        tmp_path = tmp.name
-
-    try:
-        if ANALYSIS_MODE == "real" and HAS_REAL_AI:
-            try:
-                # Real video analysis using MediaPipe and OpenCV
-                # person_id: 0 = left person, 1 = right person, None = auto-select first
-                print(f"[ANALYSIS] Starting real video analysis... (person_id={person_id})")
-                results = analyze_armwrestling_video(tmp_path, person_id=person_id)
-                
-                # Check if analysis returned an error
-                if "error" in results:
-                    # Fallback to mock if real analysis fails
-                    error_msg = results.get('error', 'Unknown error')
-                    print(f"[ERROR] Real analysis failed: {error_msg}, using mock")
-                    results = mock_analysis(video.filename)
-                    results["_fallback_reason"] = error_msg
-                else:
-                    technique = results.get('technique', {}).get('primary', 'Unknown')
-                    frames = results.get('frames_analyzed', 0)
-                    print(f"[SUCCESS] Real analysis completed: {technique} (analyzed {frames} frames)")
-                    # Add marker to show it's real analysis
-                    results["_is_real_analysis"] = True
-            except Exception as e:
-                # If real analysis crashes, fallback to mock
-                error_msg = str(e)
-                print(f"[ERROR] Real analysis exception: {error_msg}, falling back to mock")
-                import traceback
-                traceback.print_exc()
-                results = mock_analysis(video.filename)
-                results["_fallback_reason"] = f"Exception: {error_msg}"
-        else:
-            # Mock analysis (fallback)
-            results = mock_analysis(video.filename)
+    use_real_ai = ANALYSIS_MODE == "real" and HAS_REAL_AI
+    if use_real_ai:
+        results = await run_real_analysis(video, person_id)
+    else:
+        # Mock analysis never looks at the video, so skip spooling it to disk
+        results = mock_analysis(video.filename)
 
-        if user_id:
-            analysis_id = db.save_analysis(user_id, video.filename, results)
-            results["analysis_id"] = analysis_id
-            db.log_action(user_id, "analyze")
+    if user_id:
+        analysis_id = await asyncio.to_thread(db.save_analysis_and_log, user_id, video.filename, results)
+        results["analysis_id"] = analysis_id
+        _stats_cache.pop(user_id, None)
+        _history_cache.pop(user_id, None)
 
-        return JSONResponse({
-            "success": True,
-            "data": results
-        })
+    if not use_real_ai:
+        return mock_response(results.get("analysis_id"))
 
-    finally:
-        # Clean up temporary file
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except Exception as e:
-            print(f"Error removing temp file: {e}")
+    return {
+        "success": True,
+        "data": results
+    }
 
 @app.get("/api/history")
-async def history(authorization: str = Header(...)):
-    token = authorization.replace("Bearer ", "")
-    user = get_user_from_token(token)
-    if not user:
-        raise HTTPException(401, "Unauthorized")
+async def history(user: dict = Depends(current_user)):
+    analyses = _history_cache.get(user["id"])
+    if analyses is None:
+        analyses = await asyncio.to_thread(db.get_user_analyses, user["id"])
+        _history_cache[user["id"]] = analyses
 
     return {
         "success": True,
-        "analyses": db.get_user_analyses(user["id"])
+        "analyses": analyses
     }
 
 @app.get("/api/stats")
-async def stats(authorization: str = Header(...)):
-    token = authorization.replace("Bearer ", "")
-    user = get_user_from_token(token)
-    if not user:
-        raise HTTPException(401, "Unauthorized")
+async def stats(user: dict = Depends(current_user)):
+    user_stats = _stats_cache.get(user["id"])
+    if user_stats is None:
+        user_stats = await asyncio.to_thread(db.get_user_stats, user["id"])
+        _stats_cache[user["id"]] = user_stats
 
     return {
         "success": True,
-        "stats": db.get_user_stats(user["id"])
+        "stats": user_stats
     }
 
 # =========================
@@ -374,8 +614,7 @@ async def create_payment_order(
     if not razorpay or not razorpay_client:
         raise HTTPException(500, "Payment gateway not configured. Razorpay not available.")
     
-    token = authorization.replace("Bearer ", "")
-    user = get_user_from_token(token)
+    user = await get_user_from_token(extract_token(authorization))
     if not user:
         raise HTTPException(401, "Unauthorized")
     
@@ -400,7 +639,8 @@ async def create_payment_order(
         order = razorpay_client.order.create(data=order_data)
         
         # Save subscription record
-        subscription_id = db.create_subscription(
+        subscription_id = await asyncio.to_thread(
+            db.create_subscription,
             user_id=user["id"],
             plan=plan,
             amount=amount,
@@ -429,8 +669,7 @@ async def verify_payment(
     if not razorpay or not razorpay_client:
         raise HTTPException(500, "Payment gateway not configured. Razorpay not available.")
     
-    token = authorization.replace("Bearer ", "")
-    user = get_user_from_token(token)
+    user = await get_user_from_token(extract_token(authorization))
     if not user:
         raise HTTPException(401, "Unauthorized")
     
@@ -446,7 +685,8 @@ async def verify_payment(
         razorpay_client.utility.verify_payment_signature(params_dict)
         
         # Update subscription with payment details
-        result = db.update_subscription_payment(
+        result = await asyncio.to_thread(
+            db.update_subscription_payment,
             razorpay_order_id=razorpay_order_id,
             razorpay_payment_id=razorpay_payment_id,
             razorpay_signature=razorpay_signature,
@@ -455,10 +695,11 @@ async def verify_payment(
         
         if result:
             # Upgrade user plan
-            db.update_user_plan(result["user_id"], result["plan"])
+            await asyncio.to_thread(db.update_user_plan, result["user_id"], result["plan"])
+            invalidate_cached_user(result["user_id"])
             
             # Get updated user
-            updated_user = db.get_user(result["user_id"])
+            updated_user = await asyncio.to_thread(db.get_user, result["user_id"])
             
             return {
                 "success": True,
@@ -469,18 +710,9 @@ async def verify_payment(
             raise HTTPException(400, "Subscription not found")
             
     except Exception as e:
-        error_type = type(e).__name__
-        if razorpay and hasattr(razorpay, 'errors'):
-            try:
-                if isinstance(e, razorpay.errors.SignatureVerificationError):
-                    raise HTTPException(400, "Invalid payment signature")
-            except:
-                pass
-        if "signature" in str(e).lower() or "SignatureVerification" in error_type:
+        if SIGNATURE_VERIFICATION_ERROR and isinstance(e, SIGNATURE_VERIFICATION_ERROR):
             raise HTTPException(400, "Invalid payment signature")
         raise HTTPException(400, f"Payment verification failed: {str(e)}")
-    except Exception as e:
-        raise HTTPException(500, f"Payment verification failed: {str(e)}")
 
 @app.post("/api/payment/webhook")
 async def payment_webhook(request: Request):
@@ -490,14 +722,13 @@ async def payment_webhook(request: Request):
     
     try:
         body = await request.body()
-        headers = dict(request.headers)
         
         # Verify webhook signature
-        received_signature = headers.get("x-razorpay-signature", "")
+        received_signature = request.headers.get("x-razorpay-signature", "")
         
         # Calculate expected signature
         expected_signature = hmac.new(
-            RAZORPAY_WEBHOOK_SECRET.encode(),
+            _WEBHOOK_SECRET_BYTES,
             body,
             hashlib.sha256
         ).hexdigest()
@@ -506,7 +737,6 @@ async def payment_webhook(request: Request):
             raise HTTPException(400, "Invalid webhook signature")
         
         # Parse webhook payload
-        import json
         payload = json.loads(body)
         event = payload.get("event")
         payment_data = payload.get("payload", {}).get("payment", {}).get("entity", {})
@@ -516,7 +746,8 @@ async def payment_webhook(request: Request):
             payment_id = payment_data.get("id")
             
             # Update subscription
-            result = db.update_subscription_payment(
+            result = await asyncio.to_thread(
+                db.update_subscription_payment,
                 razorpay_order_id=order_id,
                 razorpay_payment_id=payment_id,
                 razorpay_signature="",  # Not available in webhook
@@ -524,7 +755,8 @@ async def payment_webhook(request: Request):
             )
             
             if result:
-                db.update_user_plan(result["user_id"], result["plan"])
+                await asyncio.to_thread(db.update_user_plan, result["user_id"], result["plan"])
+                invalidate_cached_user(result["user_id"])
         
         return {"success": True, "message": "Webhook processed"}
         
@@ -534,17 +766,28 @@ async def payment_webhook(request: Request):
 @app.post("/api/upgrade")
 async def upgrade_plan(
     plan: str = Form(...),
-    authorization: str = Header(...)
+    user: dict = Depends(current_user)
 ):
     """Legacy upgrade endpoint - redirects to payment flow"""
-    token = authorization.replace("Bearer ", "")
-    user = get_user_from_token(token)
-    if not user:
-        raise HTTPException(401, "Unauthorized")
-    
     # For backward compatibility, return payment order creation endpoint info
     return {
         "success": False,
         "message": "Please use /api/payment/create-order to initiate payment",
         "redirect": "/api/payment/create-order"
     }
+
+# =========================
+# STATIC FILES (Frontend)
+# =========================
+# Serve the frontend copy that ships next to api.py (backend/frontend mirrors
+# the project-root files). Mounted last: a Mount at "/" matches every path,
+# so routes registered after it would be unreachable.
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend")
+
+if os.path.isfile(os.path.join(FRONTEND_DIR, "index.html")):
+    # Mount static files - this will serve frontend for all non-API routes
+    app.mount("/", StaticFiles(directory=FRONTEND_DIR, html=True), name="static")
+    print(f"[OK] Frontend files will be served from: {FRONTEND_DIR}")
+    print(f"[OK] API routes are available at /api/*")
+else:
+    print(f"[WARNING] Frontend not found at {FRONTEND_DIR}. API-only mode.")
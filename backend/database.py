@@ -1,17 +1,170 @@
+import atexit
+import queue
 import sqlite3
+import threading
+import time
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-import json
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+from cachetools import TTLCache
+
+# JSON columns are written as raw UTF-8 bytes (BLOB); loads accepts both
+# those and rows stored as TEXT before the switch
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Missing or empty sections are stored as these, encoded once
+EMPTY_OBJECT_JSON = _dumps({})
+EMPTY_ARRAY_JSON = _dumps([])
+
+# Applied once to every new connection. WAL lets readers run alongside the
+# writer; NORMAL sync is durable across app crashes under WAL. page_size only
+# takes effect on a fresh file and must come before the switch to WAL.
+CONNECTION_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # KiB, upper bound per connection
+    "PRAGMA mmap_size=268435456",  # read hot pages through a 256 MiB mapping
+)
+
+# Rows come back as plain tuples; reads list their columns explicitly and
+# zip them with these names only where a dict is returned
+USER_COLUMNS = ('id', 'email', 'name', 'plan', 'created_at', 'last_login')
+ANALYSIS_COLUMNS = ('id', 'user_id', 'video_filename', 'technique_primary', 'technique_data',
+                    'risk_data', 'strength_data', 'recommendations', 'created_at')
+SUBSCRIPTION_COLUMNS = ('id', 'user_id', 'plan', 'razorpay_order_id', 'razorpay_payment_id',
+                        'razorpay_signature', 'amount', 'status', 'created_at', 'expires_at')
+
+# Statements run on every authenticated request or analysis, shared as
+# constants so each call site hits the connection's statement cache
+SQL_GET_USER = f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE id = ?"
+SQL_GET_USER_BY_EMAIL = f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE email = ?"
+SQL_GET_ANALYSIS = f"SELECT {', '.join(ANALYSIS_COLUMNS)} FROM analyses WHERE id = ?"
+SQL_USER_ANALYSES = f"""
+    SELECT {', '.join(ANALYSIS_COLUMNS)} FROM analyses
+    WHERE user_id = ?
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+SQL_INSERT_ANALYSIS = '''
+    INSERT INTO analyses 
+    (user_id, video_filename, technique_primary, technique_data, 
+     risk_data, strength_data, recommendations)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+SQL_INSERT_ANALYSIS_RETURNING = SQL_INSERT_ANALYSIS + '    RETURNING id, created_at\n'
+SQL_INSERT_USAGE = 'INSERT INTO usage_stats (user_id, action) VALUES (?, ?)'
+SQL_INSERT_USAGE_AT = 'INSERT INTO usage_stats (user_id, action, timestamp) VALUES (?, ?, ?)'
+# Half-open range on the raw column so idx_analyses_user_created can seek
+SQL_DAILY_USAGE = '''
+    SELECT COUNT(*) FROM analyses
+    WHERE user_id = ? AND created_at >= date('now') AND created_at < date('now', '+1 day')
+'''
+SQL_HAS_USAGE_TODAY = '''
+    SELECT EXISTS (
+        SELECT 1 FROM analyses
+        WHERE user_id = ? AND created_at >= date('now') AND created_at < date('now', '+1 day')
+    )
+'''
+SQL_USER_STATS = '''
+    SELECT technique_primary, COUNT(*) AS count, SUM(COUNT(*)) OVER () AS total
+    FROM analyses
+    WHERE user_id = ?
+    GROUP BY technique_primary
+    ORDER BY count DESC
+    LIMIT 1
+'''
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+CACHED_STATEMENTS = 256
+
+# Plans without a daily analysis limit; everything else gets one a day
+UNLIMITED_PLANS = frozenset({'pro', 'coach'})
+
+# In-process caches for the auth and rate-limit lookups
+QUERY_CACHE_SIZE = 4096
+USER_CACHE_TTL = 30  # seconds
+USAGE_CACHE_TTL = 5  # seconds
+ANALYSIS_CACHE_SIZE = 256
+ANALYSIS_CACHE_TTL = 60  # seconds
+
+# log_action rows are written by a background thread in batches
+USAGE_FLUSH_INTERVAL = 0.1  # seconds
+USAGE_FLUSH_BATCH = 500
+
+JSON_COLUMNS = ('technique_data', 'risk_data', 'strength_data', 'recommendations')
+
+class _LazyRow(Mapping):
+    """Read-only analyses row whose JSON columns are only decoded when read
+    
+    Not a dict subclass, so every access path (items(), dict(row), **row)
+    goes through __getitem__ and sees decoded values.
+    """
+    
+    def __init__(self, row: Tuple):
+        self._row = dict(zip(ANALYSIS_COLUMNS, row))
+        self._encoded = {key for key in JSON_COLUMNS if key in self._row}
+    
+    def __getitem__(self, key):
+        value = self._row[key]
+        if key in self._encoded:
+            value = _loads(value)
+            self._row[key] = value
+            self._encoded.discard(key)
+        return value
+    
+    def __iter__(self):
+        return iter(self._row)
+    
+    def __len__(self):
+        return len(self._row)
+    
+    def materialize(self) -> Dict[str, Any]:
+        """Plain dict with every JSON column decoded, for serialization"""
+        return {key: self[key] for key in self._row}
 
 class Database:
     def __init__(self, db_path: str = "armwrestle.db"):
         self.db_path = db_path
+        # One long-lived connection per thread: keeps SQLite's page cache
+        # warm between calls and skips the open/close on every query
+        self._local = threading.local()
+        # Shared by all threads, so guarded by a lock. Users are keyed by id
+        # and email, usage counts by user id, exhausted limits by (id, plan).
+        self._cache_lock = threading.Lock()
+        self._user_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=USER_CACHE_TTL)
+        self._email_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=USER_CACHE_TTL)
+        self._usage_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=USAGE_CACHE_TTL)
+        self._limit_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=USAGE_CACHE_TTL)
+        # Recently saved analyses as the analyses row that was written
+        self._analysis_cache = TTLCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL)
         self.init_db()
+        
+        self._usage_q = queue.Queue()
+        self._usage_writer = threading.Thread(target=self._flush_usage, name="usage-writer", daemon=True)
+        self._usage_writer.start()
+        atexit.register(self._drain)
     
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=CACHED_STATEMENTS)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
         return conn
     
     def init_db(self):
@@ -38,10 +191,10 @@ class Database:
                 user_id INTEGER,
                 video_filename TEXT NOT NULL,
                 technique_primary TEXT,
-                technique_data TEXT,
-                risk_data TEXT,
-                strength_data TEXT,
-                recommendations TEXT,
+                technique_data BLOB,
+                risk_data BLOB,
+                strength_data BLOB,
+                recommendations BLOB,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
@@ -75,216 +228,313 @@ class Database:
             )
         ''')
         
+        # Per-user lookups: recent analyses come straight off the index in
+        # created_at order, and usage counts seek instead of scanning
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analyses_user_created
+            ON analyses (user_id, created_at DESC)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_usage_stats_user_ts
+            ON usage_stats (user_id, timestamp)
+        ''')
+        # Covers get_user_stats without touching the table rows
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analyses_user_tech
+            ON analyses (user_id, technique_primary)
+        ''')
+        
         conn.commit()
-        conn.close()
     
     # User operations
     def create_user(self, email: str, name: str) -> int:
         """Create a new user"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        try:
-            cursor.execute(
-                'INSERT INTO users (email, name) VALUES (?, ?)',
-                (email, name)
-            )
-            conn.commit()
-            user_id = cursor.lastrowid
-            return user_id
-        except sqlite3.IntegrityError:
-            # User already exists
-            cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
-            return cursor.fetchone()[0]
-        finally:
-            conn.close()
+        # Existing users get their id back from the same statement
+        # (UPSERT + RETURNING, SQLite >= 3.35)
+        user_id = conn.execute('''
+            INSERT INTO users (email, name) VALUES (?, ?)
+            ON CONFLICT(email) DO UPDATE SET email = excluded.email
+            RETURNING id
+        ''', (email, name)).fetchone()[0]
+        conn.commit()
+        
+        return user_id
+    
+    def _cached_user(self, cache: TTLCache, key: Any, sql: str) -> Optional[Dict]:
+        """Look up a user through one of the user caches; misses are not cached"""
+        with self._cache_lock:
+            user = cache.get(key)
+        if user is None:
+            conn = self.get_connection()
+            row = conn.execute(sql, (key,)).fetchone()
+            if row is None:
+                return None
+            user = dict(zip(USER_COLUMNS, row))
+            with self._cache_lock:
+                self._user_cache[user['id']] = user
+                self._email_cache[user['email']] = user
+        # Callers get their own copy so they cannot mutate the cached row
+        return dict(user)
     
     def get_user(self, user_id: int) -> Optional[Dict]:
         """Get user by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return dict(row)
-        return None
+        return self._cached_user(self._user_cache, user_id, SQL_GET_USER)
     
     def get_user_by_email(self, email: str) -> Optional[Dict]:
         """Get user by email"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM users WHERE email = ?', (email,))
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return dict(row)
-        return None
+        return self._cached_user(self._email_cache, email, SQL_GET_USER_BY_EMAIL)
     
     def update_user_plan(self, user_id: int, plan: str):
         """Update user's subscription plan"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute(
-            'UPDATE users SET plan = ? WHERE id = ?',
+        row = conn.execute(
+            'UPDATE users SET plan = ? WHERE id = ? RETURNING email',
             (plan, user_id)
-        )
+        ).fetchone()
         conn.commit()
-        conn.close()
+        
+        with self._cache_lock:
+            self._user_cache.pop(user_id, None)
+            if row:
+                self._email_cache.pop(row[0], None)
     
     # Analysis operations
+    def _analysis_row(self, user_id: Optional[int], video_filename: str,
+                      analysis_data: Dict[str, Any]) -> Tuple:
+        """Parameters for SQL_INSERT_ANALYSIS"""
+        technique = analysis_data.get('technique')
+        risks = analysis_data.get('risks')
+        strength = analysis_data.get('strength')
+        recommendations = analysis_data.get('recommendations')
+        
+        return (
+            user_id,
+            video_filename,
+            technique.get('primary', '') if technique else '',
+            _dumps(technique) if technique else EMPTY_OBJECT_JSON,
+            _dumps(risks) if risks else EMPTY_ARRAY_JSON,
+            _dumps(strength) if strength else EMPTY_OBJECT_JSON,
+            _dumps(recommendations) if recommendations else EMPTY_ARRAY_JSON
+        )
+    
+    def _insert_analysis(self, cursor, user_id: Optional[int], video_filename: str,
+                         analysis_data: Dict[str, Any]) -> int:
+        """Insert an analyses row on an open cursor and return its id"""
+        params = self._analysis_row(user_id, video_filename, analysis_data)
+        analysis_id, created_at = cursor.execute(SQL_INSERT_ANALYSIS_RETURNING, params).fetchone()
+        self._cache_analysis(analysis_id, params, created_at)
+        return analysis_id
+    
+    def _cache_analysis(self, analysis_id: int, params: Tuple, created_at: str):
+        """Remember a just-written analyses row for get_analysis"""
+        # Kept encoded so get_analysis on a fresh result skips SQLite; it is
+        # decoded per read, so callers never share (or get) the caller's own
+        # objects
+        with self._cache_lock:
+            self._analysis_cache[analysis_id] = (analysis_id, *params, created_at)
+    
     def save_analysis(self, user_id: Optional[int], video_filename: str, 
                      analysis_data: Dict[str, Any]) -> int:
         """Save video analysis results"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        technique = analysis_data.get('technique', {})
-        
-        cursor.execute('''
-            INSERT INTO analyses 
-            (user_id, video_filename, technique_primary, technique_data, 
-             risk_data, strength_data, recommendations)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_id,
-            video_filename,
-            technique.get('primary', ''),
-            json.dumps(technique),
-            json.dumps(analysis_data.get('risks', [])),
-            json.dumps(analysis_data.get('strength', {})),
-            json.dumps(analysis_data.get('recommendations', []))
-        ))
+        analysis_id = self._insert_analysis(cursor, user_id, video_filename, analysis_data)
         
         conn.commit()
-        analysis_id = cursor.lastrowid
-        conn.close()
+        self._invalidate_usage(user_id)
         
         return analysis_id
     
-    def get_analysis(self, analysis_id: int) -> Optional[Dict]:
-        """Get analysis by ID"""
+    def save_analysis_and_log(self, user_id: Optional[int], video_filename: str,
+                              analysis_data: Dict[str, Any]) -> int:
+        """Save video analysis results and log the "analyze" action in one transaction"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT * FROM analyses WHERE id = ?', (analysis_id,))
-        row = cursor.fetchone()
-        conn.close()
+        analysis_id = self._insert_analysis(cursor, user_id, video_filename, analysis_data)
+        cursor.execute(SQL_INSERT_USAGE, (user_id, 'analyze'))
         
-        if row:
-            data = dict(row)
-            # Parse JSON fields
-            data['technique_data'] = json.loads(data['technique_data'])
-            data['risk_data'] = json.loads(data['risk_data'])
-            data['strength_data'] = json.loads(data['strength_data'])
-            data['recommendations'] = json.loads(data['recommendations'])
-            return data
-        return None
+        conn.commit()
+        self._invalidate_usage(user_id)
+        
+        return analysis_id
     
-    def get_user_analyses(self, user_id: int, limit: int = 10) -> List[Dict]:
-        """Get user's recent analyses"""
+    def save_analyses_bulk(self, items: List[Tuple[Optional[int], str, Dict[str, Any]]],
+                           log_usage: bool = True) -> List[int]:
+        """Save many (user_id, video_filename, analysis_data) results in one transaction
+        
+        Rows go in with one executemany; with `log_usage` each also logs an
+        "analyze" action, as save_analysis_and_log does. Returns the new ids
+        in item order.
+        """
+        rows = [self._analysis_row(*item) for item in items]
+        if not rows:
+            return []
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM analyses 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (user_id, limit))
+        # IMMEDIATE takes the write lock up front, so the AUTOINCREMENT ids
+        # of the batch are consecutive
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.executemany(SQL_INSERT_ANALYSIS, rows)
+            last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+            first_id = last_id - len(rows) + 1
+            created = cursor.execute(
+                'SELECT id, created_at FROM analyses WHERE id BETWEEN ? AND ? ORDER BY id',
+                (first_id, last_id)
+            ).fetchall()
+            if log_usage:
+                cursor.executemany(SQL_INSERT_USAGE, [(row[0], 'analyze') for row in rows])
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        conn.commit()
         
-        rows = cursor.fetchall()
-        conn.close()
+        for params, (analysis_id, created_at) in zip(rows, created):
+            self._cache_analysis(analysis_id, params, created_at)
+        for user_id in {row[0] for row in rows}:
+            self._invalidate_usage(user_id)
         
-        analyses = []
-        for row in rows:
-            data = dict(row)
-            data['technique_data'] = json.loads(data['technique_data'])
-            data['risk_data'] = json.loads(data['risk_data'])
-            data['strength_data'] = json.loads(data['strength_data'])
-            data['recommendations'] = json.loads(data['recommendations'])
-            analyses.append(data)
+        return [analysis_id for analysis_id, _ in created]
+    
+    def get_analysis(self, analysis_id: int) -> Optional[Dict]:
+        """Get analysis by ID"""
+        with self._cache_lock:
+            row = self._analysis_cache.get(analysis_id)
+        if row is None:
+            conn = self.get_connection()
+            row = conn.execute(SQL_GET_ANALYSIS, (analysis_id,)).fetchone()
         
-        return analyses
+        if row:
+            return _LazyRow(row).materialize()
+        return None
+    
+    def iter_user_analyses(self, user_id: int, limit: int = 10) -> Iterator[_LazyRow]:
+        """Yield user's recent analyses with JSON columns decoded on first access
+        
+        Must be consumed on the calling thread (connections are per thread).
+        """
+        conn = self.get_connection()
+        cursor = conn.execute(SQL_USER_ANALYSES, (user_id, limit))
+        
+        for row in cursor:
+            yield _LazyRow(row)
+    
+    def get_user_analyses(self, user_id: int, limit: int = 10) -> List[Dict]:
+        """Get user's recent analyses"""
+        return [row.materialize() for row in self.iter_user_analyses(user_id, limit)]
     
     def get_user_stats(self, user_id: int) -> Dict[str, Any]:
         """Get user statistics"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        # Total analyses
-        cursor.execute(
-            'SELECT COUNT(*) as count FROM analyses WHERE user_id = ?',
-            (user_id,)
-        )
-        total_analyses = cursor.fetchone()['count']
+        # One pass over the covering index: the window sums the per-technique
+        # groups into the total before LIMIT keeps only the top group
+        row = conn.execute(SQL_USER_STATS, (user_id,)).fetchone()
         
-        # Most common technique
-        cursor.execute('''
-            SELECT technique_primary, COUNT(*) as count 
-            FROM analyses 
-            WHERE user_id = ? 
-            GROUP BY technique_primary 
-            ORDER BY count DESC 
-            LIMIT 1
-        ''', (user_id,))
-        
-        most_common = cursor.fetchone()
-        
-        conn.close()
+        if not row:
+            return {'total_analyses': 0, 'most_common_technique': None, 'technique_count': 0}
         
+        technique_primary, count, total = row
         return {
-            'total_analyses': total_analyses,
-            'most_common_technique': most_common['technique_primary'] if most_common else None,
-            'technique_count': most_common['count'] if most_common else 0
+            'total_analyses': total,
+            'most_common_technique': technique_primary,
+            'technique_count': count
         }
     
-    # Usage tracking
-    def log_action(self, user_id: Optional[int], action: str):
-        """Log user action for analytics"""
+    def get_technique_distribution(self, user_id: int) -> Dict[str, int]:
+        """Count user's analyses per primary technique, most frequent first"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute(
-            'INSERT INTO usage_stats (user_id, action) VALUES (?, ?)',
-            (user_id, action)
-        )
-        conn.commit()
-        conn.close()
+        # Index-only over idx_analyses_user_tech; technique_data is never read
+        rows = conn.execute('''
+            SELECT technique_primary, COUNT(*)
+            FROM analyses
+            WHERE user_id = ?
+            GROUP BY technique_primary
+            ORDER BY COUNT(*) DESC
+        ''', (user_id,)).fetchall()
+        
+        return {technique: count for technique, count in rows}
+    
+    # Usage tracking
+    def log_action(self, user_id: Optional[int], action: str):
+        """Log user action for analytics (queued, written in the background)"""
+        # Same format as CURRENT_TIMESTAMP so both kinds of rows sort together
+        self._usage_q.put_nowait((user_id, action, time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())))
+    
+    def _flush_usage(self):
+        """Writer thread: batch queued actions into one transaction per flush"""
+        while True:
+            item = self._usage_q.get()
+            rows = []
+            deadline = time.monotonic() + USAGE_FLUSH_INTERVAL
+            while item is not None:
+                rows.append(item)
+                if len(rows) >= USAGE_FLUSH_BATCH:
+                    break
+                try:
+                    item = self._usage_q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            
+            if rows:
+                try:
+                    conn = self.get_connection()
+                    conn.executemany(SQL_INSERT_USAGE_AT, rows)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    print(f"[DB] Failed to write {len(rows)} usage rows: {e}")
+            if item is None:
+                return
+    
+    def _drain(self):
+        """Flush queued actions and stop the writer thread"""
+        self._usage_q.put(None)
+        self._usage_writer.join(timeout=5)
+    
+    def _invalidate_usage(self, user_id: Optional[int]):
+        """Drop the cached daily count after a new analysis for this user"""
+        with self._cache_lock:
+            self._usage_cache.pop(user_id, None)
     
     def get_daily_usage(self, user_id: int) -> int:
         """Get number of analyses today"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT COUNT(*) as count 
-            FROM analyses 
-            WHERE user_id = ? 
-            AND DATE(created_at) = DATE('now')
-        ''', (user_id,))
-        
-        count = cursor.fetchone()['count']
-        conn.close()
-        
+        with self._cache_lock:
+            count = self._usage_cache.get(user_id)
+        if count is None:
+            conn = self.get_connection()
+            count = conn.execute(SQL_DAILY_USAGE, (user_id,)).fetchone()[0]
+            with self._cache_lock:
+                self._usage_cache[user_id] = count
         return count
     
     def check_usage_limit(self, user_id: int, plan: str) -> bool:
         """Check if user has exceeded their plan limits"""
-        daily_usage = self.get_daily_usage(user_id)
+        if plan in UNLIMITED_PLANS:
+            return True
         
-        limits = {
-            'free': 1,
-            'pro': float('inf'),
-            'coach': float('inf')
-        }
+        # Usage only grows during the day, so an exhausted limit stays
+        # exhausted and can be answered without a query
+        with self._cache_lock:
+            if self._limit_cache.get((user_id, plan)):
+                return False
+        
+        # Every other plan allows one analysis a day, so only existence
+        # matters; EXISTS stops at the first row instead of counting
+        conn = self.get_connection()
+        allowed = not conn.execute(SQL_HAS_USAGE_TODAY, (user_id,)).fetchone()[0]
         
-        return daily_usage < limits.get(plan, 1)
+        if not allowed:
+            with self._cache_lock:
+                self._limit_cache[(user_id, plan)] = True
+        return allowed
     
     # Subscription operations
     def create_subscription(self, user_id: int, plan: str, amount: int, 
@@ -305,7 +555,6 @@ class Database:
         
         conn.commit()
         subscription_id = cursor.lastrowid
-        conn.close()
         
         return subscription_id
     
@@ -331,7 +580,6 @@ class Database:
         cursor.execute('SELECT user_id, plan FROM subscriptions WHERE razorpay_order_id = ?', 
                       (razorpay_order_id,))
         result = cursor.fetchone()
-        conn.close()
         
         if result:
             return {'user_id': result[0], 'plan': result[1]}
@@ -340,20 +588,16 @@ class Database:
     def get_active_subscription(self, user_id: int):
         """Get user's active subscription"""
         conn = self.get_connection()
-        cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT * FROM subscriptions 
+        row = conn.execute(f'''
+            SELECT {', '.join(SUBSCRIPTION_COLUMNS)} FROM subscriptions 
             WHERE user_id = ? 
             AND status = 'completed'
             AND expires_at > datetime('now')
             ORDER BY created_at DESC
             LIMIT 1
-        ''', (user_id,))
-        
-        row = cursor.fetchone()
-        conn.close()
+        ''', (user_id,)).fetchone()
         
         if row:
-            return dict(row)
+            return dict(zip(SUBSCRIPTION_COLUMNS, row))
         return None
\ No newline at end of file
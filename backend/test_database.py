@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from database import Database
+
+
+class SaveAnalysesBulkTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = Database(os.path.join(tmp.name, "test.db"))
+
+    def test_matches_single_saves(self):
+        db = self.db
+        user_id = db.create_user("bulk@example.com", "Bulk")
+        single_id = db.save_analysis_and_log(user_id, "single.mp4", {"technique": {"primary": "Press"}})
+        items = [
+            (user_id, "a.mp4", {"technique": {"primary": "Hook"}, "risks": ({"title": "Wrist Collapse Risk"},)}),
+            (user_id, "b.mp4", {"technique": {"primary": "Top Roll"}, "recommendations": ["Wrist curls"]}),
+            (None, "c.mp4", {}),
+        ]
+
+        ids = db.save_analyses_bulk(items)
+
+        self.assertEqual(ids, [single_id + 1, single_id + 2, single_id + 3])
+        cached = [db.get_analysis(analysis_id) for analysis_id in ids]
+        db._analysis_cache.clear()
+        stored = [db.get_analysis(analysis_id) for analysis_id in ids]
+        # The cache serves the row as written, decoded into fresh objects
+        self.assertEqual(cached, stored)
+        self.assertEqual(stored[0]["risk_data"], [{"title": "Wrist Collapse Risk"}])
+        self.assertEqual(stored[1]["technique_primary"], "Top Roll")
+        self.assertEqual(stored[2]["technique_data"], {})
+        self.assertEqual(stored[2]["recommendations"], [])
+
+        # Each row logged an "analyze" action and counts towards today's usage
+        usage = db.get_connection().execute(
+            "SELECT COUNT(*) FROM usage_stats WHERE action = 'analyze'"
+        ).fetchone()[0]
+        self.assertEqual(usage, 4)
+        self.assertEqual(db.get_daily_usage(user_id), 3)
+
+    def test_empty(self):
+        self.assertEqual(self.db.save_analyses_bulk([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,33 +5,639 @@ Uses MediaPipe for pose detection and OpenCV for video processing
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Callable, Dict, List, Any, NamedTuple, Tuple, Optional, Union
+import abc
+import concurrent.futures
 import math
-import statistics
-from collections import defaultdict
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import av
+except ImportError:
+    av = None
+
+# MediaPipe Pose already runs its TFLite landmark model on the XNNPACK CPU
+# delegate; the cheapest lever left is the model size.
+# 0 = lite, 1 = full, 2 = heavy
+# The full model is the only one shipped in the mediapipe wheel; the others
+# are downloaded into site-packages on first use, so they are opt-in.
+BUNDLED_POSE_MODEL_COMPLEXITY = 1
+# The tracking graph defaults to the full model. POSE_MODEL_COMPLEXITY=0
+# opts into lite, which roughly halves landmark inference and is coarse
+# enough for the elbow and shoulder angles, but has to be downloaded
+POSE_MODEL_COMPLEXITY = int(os.getenv("POSE_MODEL_COMPLEXITY", str(BUNDLED_POSE_MODEL_COMPLEXITY)))
+# The people-detection and anchor passes only need coarse shoulder and hip
+# positions, which the lite model places well enough at about half the cost,
+# so their static graph defaults to lite. Where it can't be downloaded the
+# first analyzer in a process falls back to the full model and later ones
+# skip straight to it (see _build_pose).
+POSE_STATIC_MODEL_COMPLEXITY = int(os.getenv("POSE_STATIC_MODEL_COMPLEXITY", "0"))
+# Model complexities whose download already failed in this process
+_unavailable_pose_models = set()
+
+# ARMWRESTLE_POSE_BACKEND=gpu runs pose inference on MediaPipe Tasks'
+# PoseLandmarker with the GPU delegate, loading the .task model bundle at
+# POSE_LANDMARKER_MODEL. Anything else (or a GPU that can't be set up)
+# keeps the mp.solutions CPU graphs.
+POSE_BACKEND = os.getenv("ARMWRESTLE_POSE_BACKEND", "cpu")
+POSE_LANDMARKER_MODEL = os.getenv("POSE_LANDMARKER_MODEL", "")
+
+# Frames are shrunk so their longer side is at most this many pixels before
+# pose inference. The model's input is 256x256 and landmarks come back
+# normalized, so larger frames only cost conversion and copy bandwidth.
+POSE_INPUT_MAX_SIDE = int(os.getenv("POSE_INPUT_MAX_SIDE", "480"))
+
+def pose_input_size(width: int, height: int) -> Tuple[int, int]:
+    """(width, height) a frame is shrunk to before pose inference"""
+    scale = POSE_INPUT_MAX_SIDE / max(height, width)
+    if scale >= 1.0:
+        return width, height
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+# VIDEO_DECODER=pyav makes FrameReader decode with PyAV (when installed):
+# swscale shrinks sampled frames to the pose input size in the same pass as
+# the BGR conversion, so full-size BGR frames are never built. OpenCV's
+# capture stays the default for its hardware decode hints; both decode on
+# FFmpeg's frame threads.
+PYAV_DECODE = av is not None and os.getenv("VIDEO_DECODER", "opencv") == "pyav"
+
+def _has_cuda_decode() -> bool:
+    """True when this OpenCV build has cudacodec and a CUDA device is present"""
+    try:
+        return hasattr(cv2, "cudacodec") and cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+HAS_CUDA_DECODE = _has_cuda_decode()
+
+# Open parameters asking the FFmpeg capture backend for hardware decoding
+HW_DECODE_PARAMS = [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+
+# Landmark indices for key joints, resolved from the PoseLandmark enum once
+# instead of per frame
+_PoseLandmark = mp.solutions.pose.PoseLandmark
+LEFT_SHOULDER = _PoseLandmark.LEFT_SHOULDER.value
+RIGHT_SHOULDER = _PoseLandmark.RIGHT_SHOULDER.value
+LEFT_ELBOW = _PoseLandmark.LEFT_ELBOW.value
+RIGHT_ELBOW = _PoseLandmark.RIGHT_ELBOW.value
+LEFT_WRIST = _PoseLandmark.LEFT_WRIST.value
+RIGHT_WRIST = _PoseLandmark.RIGHT_WRIST.value
+LEFT_HIP = _PoseLandmark.LEFT_HIP.value
+RIGHT_HIP = _PoseLandmark.RIGHT_HIP.value
+
+# A NormalizedLandmark with x, y, z, visibility and presence all set
+# serializes to a fixed 27-byte record: field tag + length, then a tag byte
+# and a little-endian float32 per field. A whole NormalizedLandmarkList is
+# these records back to back, so coordinates can be read with one view.
+_LANDMARK_RECORD = np.dtype([
+    ("tag", "u1"), ("size", "u1"),
+    ("x_tag", "u1"), ("x", "<f4"),
+    ("y_tag", "u1"), ("y", "<f4"),
+    ("z_tag", "u1"), ("z", "<f4"),
+    ("rest", "V10"),
+])
+
+def landmarks_to_array(landmark_list) -> np.ndarray:
+    """(N, 3) float64 array of x, y, z from a NormalizedLandmarkList"""
+    data = landmark_list.SerializeToString()
+    if len(data) % _LANDMARK_RECORD.itemsize == 0:
+        records = np.frombuffer(data, dtype=_LANDMARK_RECORD)
+        if ((records["tag"] == 0x0A).all() and (records["size"] == 0x19).all()
+                and (records["x_tag"] == 0x0D).all() and (records["y_tag"] == 0x15).all()
+                and (records["z_tag"] == 0x1D).all()):
+            return np.column_stack((records["x"], records["y"], records["z"])).astype(np.float64)
+    # Some field missing, so records aren't fixed-size; read them one by one
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmark_list.landmark], dtype=np.float64)
+
+# Strength metrics reported per frame and the score each level counts for
+# when frames are averaged
+STRENGTH_METRICS = ("Back Pressure", "Wrist Control", "Side Pressure")
+STRENGTH_LEVEL_SCORES = {"Strong": 7.5, "Moderate": 6.0, "Weak": 4.0}
+
+class ArmGeometry(NamedTuple):
+    """Per-frame measurements of the active arm shared by the frame analyses"""
+    elbow_angle: float
+    shoulder_angle: float
+    wrist_elbow_distance: float
+    shoulder_elbow_distance: float
+
+class ArmFeatures(NamedTuple):
+    """Active-arm landmarks and measurements, extracted once per frame and
+    shared by detect_technique, assess_injury_risks and analyze_strength"""
+    shoulder: Any
+    elbow: Any
+    wrist: Any
+    other_shoulder: Any
+    body_center_x: float
+    arm: ArmGeometry
+
+# Techniques a frame can be classified as, indexed by their int8 code
+TECHNIQUES = ("Unknown", "Top Roll", "Hook", "Press", "King's Move")
+TECHNIQUE_CODES = {name: code for code, name in enumerate(TECHNIQUES)}
+
+# Training recommendations keyed by primary technique, high-level risk title
+# and weak strength metric
+TECHNIQUE_RECOMMENDATIONS = {
+    "Top Roll": (
+        "Wrist curls (3x15) - Focus on pronation strength to prevent collapse",
+        "Static wrist holds (4x30s) - Build endurance in top position",
+    ),
+    "Hook": (
+        "Hook transition practice - Improve power during technique changes",
+        "Side pressure drills - Enhance lateral force application",
+    ),
+}
+_ELBOW_RECOMMENDATIONS = ("Elbow position drills - Practice keeping elbow angle below 35°",)
+_WRIST_RECOMMENDATIONS = ("Wrist stability exercises - Focus on preventing collapse",)
+RISK_RECOMMENDATIONS = {
+    "Elbow Ligament Stress": _ELBOW_RECOMMENDATIONS,
+    "Elbow Flare Detected": _ELBOW_RECOMMENDATIONS,
+    "Elbow Position Warning": _ELBOW_RECOMMENDATIONS,
+    "Wrist Collapse Risk": _WRIST_RECOMMENDATIONS,
+}
+WEAK_STRENGTH_RECOMMENDATIONS = {
+    "Wrist Control": (
+        "Pronation training - Strengthen wrist pronators",
+        "Wrist curls and static holds - Build wrist endurance",
+    ),
+    "Back Pressure": (
+        "Back pressure training - Improve pulling strength",
+        "Elbow angle drills - Maintain optimal position",
+    ),
+}
+
+class CudaVideoCapture:
+    """Minimal cv2.VideoCapture stand-in that decodes on the GPU (NVDEC)
+    
+    Only read()/grab()/retrieve()/isOpened()/release() are provided - enough
+    for the frame loops. Frames are downloaded as BGR so the CPU pipeline is
+    unchanged; grab() leaves the frame on the GPU.
+    """
+    def __init__(self, video_path: str):
+        self._gpu_frame = None
+        try:
+            self._reader = cv2.cudacodec.createVideoReader(video_path)
+        except cv2.error:
+            self._reader = None
+    
+    def isOpened(self) -> bool:
+        return self._reader is not None
+    
+    def grab(self) -> bool:
+        if self._reader is None:
+            return False
+        ret, gpu_frame = self._reader.nextFrame()
+        self._gpu_frame = gpu_frame if ret else None
+        return ret
+    
+    def retrieve(self) -> Tuple[bool, Optional[np.ndarray]]:
+        gpu_frame = self._gpu_frame
+        if gpu_frame is None:
+            return False, None
+        if gpu_frame.channels() == 4:
+            gpu_frame = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR)
+        return True, gpu_frame.download()
+    
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+    
+    def release(self):
+        self._reader = None
+        self._gpu_frame = None
+
+def open_video(video_path: str):
+    """Open a video for frame-by-frame decoding, on the GPU when available"""
+    if HAS_CUDA_DECODE:
+        cap = CudaVideoCapture(video_path)
+        if cap.isOpened():
+            return cap
+    # FFmpeg with whatever hardware decoder the platform offers (VA-API,
+    # D3D11VA, VideoToolbox); FFmpeg falls back to software decoding itself
+    # when none is usable. Builds without the FFmpeg backend get the default.
+    cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, HW_DECODE_PARAMS)
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(video_path)
+    # Frames are pulled as fast as they decode; don't let the backend queue more
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+def probe_video(video_path: str) -> Optional[Tuple[int, float]]:
+    """Return (frame_count, fps) for a video, or None if it can't be opened
+    
+    PyAV only parses the container headers; cv2.VideoCapture (the fallback
+    when PyAV isn't installed) also sets up a decoder just to answer this.
+    """
+    if av is not None:
+        try:
+            with av.open(video_path) as container:
+                stream = container.streams.video[0]
+                fps = float(stream.average_rate or 0)
+                frame_count = stream.frames
+                if not frame_count and container.duration and fps:
+                    # Some containers don't record nb_frames
+                    frame_count = int(container.duration / av.time_base * fps)
+                return frame_count, fps
+        except (av.error.FFmpegError, IndexError):
+            return None
+    
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+
+def error_result(error: str, description: str, people_detected: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Empty analysis returned when a video can't be analyzed"""
+    return {
+        "error": error,
+        "technique": {"primary": "Unknown", "transitions": [], "description": description},
+        "risks": [],
+        "strength": {},
+        "recommendations": [],
+        "people_detected": people_detected or []
+    }
+
+# Decoded frames buffered ahead of pose inference, and pose results
+# buffered ahead of the per-frame analysis
+FRAME_PREFETCH = 8
+POSE_PREFETCH = 4
+
+# Frames sampled for the per-frame analysis pass. Technique classification
+# is coarse, so ~60 evenly spaced frames are plenty however long the video.
+TARGET_ANALYZED_FRAMES = 60
+MIN_SAMPLE_RATE = 5
+
+# Videos at least this many frames long per worker are decoded in parallel
+# intervals, one worker process each; DECODE_WORKERS=1 turns this off
+DECODE_WORKERS = int(os.getenv("DECODE_WORKERS", str(min(os.cpu_count() or 1, 4))))
+PARALLEL_DECODE_MIN_FRAMES = 1800  # one minute at 30 fps
+
+_decode_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_decode_executor_lock = threading.Lock()
+
+def decode_executor() -> concurrent.futures.ProcessPoolExecutor:
+    """Process pool for parallel interval decoding, started on first use
+    
+    The workers keep their Pose graphs between videos, so only the first
+    long video pays for loading the model in each.
+    """
+    global _decode_executor
+    with _decode_executor_lock:
+        if _decode_executor is None:
+            # spawn, not fork: the reader and pose threads may be running
+            _decode_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=DECODE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _decode_executor
+
+def limit_decode_workers(workers: int):
+    """Cap DECODE_WORKERS in this process; call before the decode pool starts
+    
+    The API's analysis worker processes each get their share of the CPUs,
+    so N analyses don't each spawn a full-size decode pool.
+    """
+    global DECODE_WORKERS
+    DECODE_WORKERS = max(1, min(DECODE_WORKERS, workers))
+
+def analysis_settings() -> Dict[str, Any]:
+    """Settings in this process that change analyze_video's output
+    
+    Cached analyses are keyed on these, so a config change misses the cache.
+    """
+    return {
+        "pose_model_complexity": POSE_MODEL_COMPLEXITY,
+        "pose_static_model_complexity": POSE_STATIC_MODEL_COMPLEXITY,
+        "pose_backend": POSE_BACKEND,
+        "pose_landmarker_model": POSE_LANDMARKER_MODEL,
+        "pose_input_max_side": POSE_INPUT_MAX_SIDE,
+        "pyav_decode": PYAV_DECODE,
+        "target_analyzed_frames": TARGET_ANALYZED_FRAMES,
+        "min_sample_rate": MIN_SAMPLE_RATE,
+        # Parallel intervals restart pose tracking at their bounds
+        "decode_workers": DECODE_WORKERS,
+        "parallel_decode_min_frames": PARALLEL_DECODE_MIN_FRAMES,
+    }
+
+class _BackgroundIterator(abc.ABC):
+    """Run `_produce` on a daemon thread and iterate what it `_put`s
+    
+    The bounded queue lets the producer work ahead of the consumer. An
+    exception in the producer is re-raised in the consumer once the items
+    produced before it have been yielded.
+    """
+    _DONE = object()
+    
+    def __init__(self, prefetch: int):
+        self._queue = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self._error = None
+    
+    @abc.abstractmethod
+    def _produce(self):
+        """Produce the items, handing each to `_put`; runs on the background thread"""
+    
+    def _put(self, item) -> bool:
+        # Give up if the consumer has stopped iterating
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _run(self):
+        try:
+            self._produce()
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(self._DONE)
+    
+    def __iter__(self):
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._DONE:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+            thread.join()
+        if self._error is not None:
+            raise self._error
+
+class FrameReader(_BackgroundIterator):
+    """Iterate (frame_index, frame) over every `sample_rate`-th frame of a video
+    
+    Decoding runs on a background thread that feeds a bounded queue, so the
+    next frames decode while the caller runs pose inference on the current
+    one. Skipped frames are only grab()bed; the BGR conversion and copy in
+    retrieve() is paid for sampled frames alone. `frames_read` counts every
+    frame, sampled or not. `sample`, when given, picks the frames by index
+    instead of `sample_rate`. Reading starts at `start_frame` and stops
+    before frame index `max_frames`.
+    
+    With `seek`, sparse sampling may jump between sampled frames with
+    CAP_PROP_POS_FRAMES instead of grab()bing the frames in between. The
+    grabs through the first stride are timed against a seek to the next
+    sampled frame, and seeking carries on only if it was faster - it is
+    for all-intra codecs like MJPEG, not for long-GOP H.264. When seeking,
+    `frames_read` stops at the last frame read.
+    """
+    def __init__(self, video_path: str, sample_rate: int = 1,
+                 max_frames: Optional[int] = None, prefetch: int = FRAME_PREFETCH,
+                 sample: Optional[Callable[[int], bool]] = None, seek: bool = False,
+                 start_frame: int = 0):
+        super().__init__(prefetch)
+        self.video_path = video_path
+        self.sample_rate = sample_rate
+        self.max_frames = max_frames
+        self.sample = sample or (lambda frame_index: frame_index % sample_rate == 0)
+        self.seek = seek and sample is None and sample_rate > 1
+        self.start_frame = start_frame
+        self.frames_read = start_frame
+    
+    def _produce(self):
+        if PYAV_DECODE and not HAS_CUDA_DECODE and not self.seek and not self.start_frame:
+            self._produce_pyav()
+            return
+        cap = open_video(self.video_path)
+        try:
+            if self.start_frame:
+                if isinstance(cap, cv2.VideoCapture):
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, self.start_frame)
+                else:
+                    # CudaVideoCapture can't seek
+                    for _ in range(self.start_frame):
+                        if not cap.grab():
+                            return
+            stride = self.sample_rate
+            # CudaVideoCapture can't seek
+            can_seek = self.seek and isinstance(cap, cv2.VideoCapture)
+            seeking = False
+            stride_grab_time = 0.0  # Time spent grab()bing frames 1..stride
+            seek_to = None  # Frame to jump to before the next grab
+            while cap.isOpened():
+                frame_index = self.frames_read if seek_to is None else seek_to
+                if self.max_frames is not None and frame_index >= self.max_frames:
+                    break
+                started = time.perf_counter()
+                if seek_to is not None:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, seek_to)
+                if not cap.grab():
+                    break
+                if can_seek:
+                    elapsed = time.perf_counter() - started
+                    offset = frame_index - self.start_frame
+                    if 0 < offset <= stride:
+                        stride_grab_time += elapsed
+                    elif offset == 2 * stride and seek_to is not None:
+                        # The trial seek; keep seeking only if it won
+                        seeking = elapsed < stride_grab_time
+                        can_seek = seeking
+                seek_to = None
+                self.frames_read = frame_index
+                if self.sample(frame_index):
+                    ret, frame = cap.retrieve()
+                    if not ret or not self._put((frame_index, frame)):
+                        break
+                    if can_seek and (seeking or frame_index - self.start_frame == stride):
+                        seek_to = frame_index + stride
+                self.frames_read += 1
+        finally:
+            cap.release()
+
+    def _produce_pyav(self):
+        """_produce on PyAV; sampled frames come out already at the pose input size"""
+        try:
+            container = av.open(self.video_path)
+        except av.error.FFmpegError:
+            return
+        with container:
+            if not container.streams.video:
+                return
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            size = None
+            try:
+                for frame in container.decode(stream):
+                    if self.max_frames is not None and self.frames_read >= self.max_frames:
+                        break
+                    if self.sample(self.frames_read):
+                        if size is None:
+                            size = pose_input_size(frame.width, frame.height)
+                        image = frame.to_ndarray(format="bgr24", width=size[0], height=size[1],
+                                                 interpolation="AREA")
+                        if not self._put((self.frames_read, image)):
+                            break
+                    self.frames_read += 1
+            except av.error.FFmpegError:
+                # A corrupt packet ends the video, as a failed grab() does
+                pass
+
+class PoseStream(_BackgroundIterator):
+    """Iterate (frame_index, landmarks) for every frame a FrameReader yields
+    
+    Pose inference runs on its own thread, so decoding, inference and the
+    caller's per-frame Python work overlap instead of taking turns.
+    `landmarks` is None for frames where no pose was found; `static` is
+    passed through to detect_pose, either for every frame or decided per
+    frame index.
+    """
+    def __init__(self, analyzer: "ArmWrestlingAnalyzer", reader: FrameReader,
+                 static: Union[bool, Callable[[int], bool]] = False,
+                 prefetch: int = POSE_PREFETCH):
+        super().__init__(prefetch)
+        self.analyzer = analyzer
+        self.reader = reader
+        self.static = static if callable(static) else (lambda frame_index: static)
+    
+    def _produce(self):
+        frames = iter(self.reader)
+        try:
+            for frame_index, frame in frames:
+                landmarks = self.analyzer.detect_pose(frame, self.static(frame_index))
+                if not self._put((frame_index, landmarks)):
+                    break
+        finally:
+            frames.close()
+
+class TasksPose:
+    """Pose graph on MediaPipe Tasks' PoseLandmarker with the GPU delegate
+    
+    Stands in for mp.solutions.pose.Pose when POSE_BACKEND is "gpu".
+    landmarks() returns the (33, 3) x, y, z array directly instead of a
+    results object. Tracking graphs run in VIDEO mode, which needs rising
+    timestamps, so frames are stamped 33 ms apart.
+    """
+    FRAME_INTERVAL_MS = 33
+    
+    def __init__(self, model_path: str, static_image_mode: bool = False,
+                 min_detection_confidence: float = 0.5, min_tracking_confidence: float = 0.5, **_):
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+        running_mode = vision.RunningMode.IMAGE if static_image_mode else vision.RunningMode.VIDEO
+        self._options = vision.PoseLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(
+                model_asset_path=model_path, delegate=mp_tasks.BaseOptions.Delegate.GPU
+            ),
+            running_mode=running_mode,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            output_segmentation_masks=False
+        )
+        self._create = vision.PoseLandmarker.create_from_options
+        self._static = static_image_mode
+        self._landmarker = self._create(self._options)
+        self._timestamp_ms = 0
+    
+    def landmarks(self, rgb_frame: np.ndarray) -> Optional[np.ndarray]:
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        if self._static:
+            result = self._landmarker.detect(image)
+        else:
+            self._timestamp_ms += self.FRAME_INTERVAL_MS
+            result = self._landmarker.detect_for_video(image, self._timestamp_ms)
+        if not result.pose_landmarks:
+            return None
+        return np.array([(lm.x, lm.y, lm.z) for lm in result.pose_landmarks[0]], dtype=np.float64)
+    
+    def reset(self):
+        # A fresh landmarker forgets the last video's ROI and timestamps
+        self._landmarker.close()
+        self._landmarker = self._create(self._options)
+        self._timestamp_ms = 0
+
+def scan_interval(video_path: str, sample_rate: int, anchor_frames: frozenset,
+                  start_frame: int = 0, stop_frame: Optional[int] = None) -> Tuple[List[Tuple[int, np.ndarray]], int]:
+    """Landmarks of the frames analyze_video samples in [start_frame, stop_frame)
+    
+    Every `sample_rate`-th frame goes through the tracking graph; frames only
+    in `anchor_frames` go through the static one. Returns the
+    (frame_index, landmarks) of each sampled frame with a pose, and the index
+    reading stopped at. Runs in a decode worker process, which builds its
+    own analyzer on first use.
+    """
+    global _interval_analyzer
+    if _interval_analyzer is None:
+        _interval_analyzer = ArmWrestlingAnalyzer()
+    return _interval_analyzer.scan_poses(video_path, sample_rate, anchor_frames, start_frame, stop_frame)
+
+_interval_analyzer = None
 
 class ArmWrestlingAnalyzer:
     def __init__(self):
         # Initialize MediaPipe pose detection
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
+        # Tracking reuses the last frame's ROI instead of re-running the
+        # detector; a slightly lower tracking confidence keeps it from
+        # dropping back to detection on every sampled frame. No
+        # segmentation mask is needed, so that head is never run.
+        self.pose = self._build_pose(
+            POSE_MODEL_COMPLEXITY,
             min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            model_complexity=1,
-            static_image_mode=False
+            min_tracking_confidence=0.4,
+            static_image_mode=False,
+            smooth_landmarks=True,
+            enable_segmentation=False
+        )
+        # The people-detection and anchor passes sample frames far apart, so
+        # tracking from one to the next only costs a failed ROI guess; they
+        # run every frame through detection instead
+        self.pose_static = self._build_pose(
+            POSE_STATIC_MODEL_COMPLEXITY,
+            min_detection_confidence=0.5,
+            static_image_mode=True,
+            enable_segmentation=False
         )
         self.mp_drawing = mp.solutions.drawing_utils
+        # Downscaled and RGB copies of the current frame, reused while the
+        # frame size holds
+        self._small_buf = None
+        self._rgb_buf = None
         
-        # Landmark indices for key joints
-        self.LEFT_SHOULDER = 11
-        self.RIGHT_SHOULDER = 12
-        self.LEFT_ELBOW = 13
-        self.RIGHT_ELBOW = 14
-        self.LEFT_WRIST = 15
-        self.RIGHT_WRIST = 16
-        self.LEFT_HIP = 23
-        self.RIGHT_HIP = 24
+    def _build_pose(self, model_complexity: int, **options):
+        """mp Pose graph, on the bundled model if `model_complexity`'s can't be fetched
         
+        With the GPU backend selected, a TasksPose is returned instead.
+        """
+        if POSE_BACKEND == "gpu":
+            try:
+                if not POSE_LANDMARKER_MODEL:
+                    raise ValueError("POSE_LANDMARKER_MODEL is not set")
+                return TasksPose(POSE_LANDMARKER_MODEL, **options)
+            except Exception as e:
+                print(f"[WARNING] GPU pose backend unavailable ({e}), using the CPU graph")
+        if model_complexity not in _unavailable_pose_models:
+            try:
+                return self.mp_pose.Pose(model_complexity=model_complexity, **options)
+            except Exception as e:
+                if model_complexity == BUNDLED_POSE_MODEL_COMPLEXITY:
+                    raise
+                # Downloading the model fails offline; don't retry it for
+                # every analyzer this process builds
+                _unavailable_pose_models.add(model_complexity)
+                print(f"[WARNING] Pose model {model_complexity} unavailable ({e}), using model_complexity={BUNDLED_POSE_MODEL_COMPLEXITY}")
+        return self.mp_pose.Pose(model_complexity=BUNDLED_POSE_MODEL_COMPLEXITY, **options)
+    
+    def reset(self):
+        """Clear per-video tracking state so the analyzer can take another video"""
+        self.pose.reset()
+    
     def calculate_angle(self, point1: Tuple, point2: Tuple, point3: Tuple) -> float:
         """Calculate angle between three points"""
         a = np.array(point1)
@@ -46,102 +652,111 @@ class ArmWrestlingAnalyzer:
             
         return angle
     
+    def calculate_angles(self, points1: np.ndarray, points2: np.ndarray, points3: np.ndarray) -> np.ndarray:
+        """Vectorized calculate_angle over (N, 2+) arrays of points, one row per frame"""
+        radians = (np.arctan2(points3[:, 1] - points2[:, 1], points3[:, 0] - points2[:, 0])
+                   - np.arctan2(points1[:, 1] - points2[:, 1], points1[:, 0] - points2[:, 0]))
+        angles = np.abs(radians * 180.0 / np.pi)
+        return np.where(angles > 180.0, 360 - angles, angles)
+    
     def calculate_distance(self, point1: Tuple, point2: Tuple) -> float:
         """Calculate Euclidean distance between two points"""
         return np.sqrt((point1[0] - point2[0])**2 + (point1[1] - point2[1])**2)
     
-    def detect_technique(self, landmarks: List, frame_count: int) -> Dict[str, Any]:
-        """Detect arm wrestling technique based on pose analysis"""
-        if not landmarks or len(landmarks) < 17:
-            return {"primary": "Unknown", "transitions": [], "description": "Insufficient pose data"}
-        
-        # Determine which arm is active (closer to center of video = active arm)
-        # For arm wrestling, the arm closer to opponent is usually more visible
-        right_shoulder = landmarks[self.RIGHT_SHOULDER]
-        left_shoulder = landmarks[self.LEFT_SHOULDER]
-        right_elbow = landmarks[self.RIGHT_ELBOW]
-        left_elbow = landmarks[self.LEFT_ELBOW]
-        right_wrist = landmarks[self.RIGHT_WRIST]
-        left_wrist = landmarks[self.LEFT_WRIST]
-        
+    def calculate_distances(self, points1: np.ndarray, points2: np.ndarray) -> np.ndarray:
+        """Vectorized calculate_distance over (N, 2+) arrays of points"""
+        return np.sqrt((points1[:, 0] - points2[:, 0])**2 + (points1[:, 1] - points2[:, 1])**2)
+    
+    def arm_geometry(self, shoulder: Tuple, elbow: Tuple, wrist: Tuple, other_shoulder: Tuple) -> ArmGeometry:
+        """ArmGeometry for a single frame's active arm"""
+        return ArmGeometry(
+            self.calculate_angle(shoulder, elbow, wrist),
+            self.calculate_angle(elbow, shoulder, other_shoulder),
+            self.calculate_distance(wrist, elbow),
+            self.calculate_distance(shoulder, elbow),
+        )
+    
+    def calculate_arm_geometry(self, frames: np.ndarray) -> np.ndarray:
+        """ArmGeometry of the active arm for every frame of an (N, 33, 3) landmark array
+        
+        Returns an (N, 4) array whose columns follow ArmGeometry's fields.
+        """
+        use_right_arm = (frames[:, RIGHT_WRIST, 1] < frames[:, LEFT_WRIST, 1])[:, None]
+        shoulder = np.where(use_right_arm, frames[:, RIGHT_SHOULDER], frames[:, LEFT_SHOULDER])
+        elbow = np.where(use_right_arm, frames[:, RIGHT_ELBOW], frames[:, LEFT_ELBOW])
+        wrist = np.where(use_right_arm, frames[:, RIGHT_WRIST], frames[:, LEFT_WRIST])
+        other_shoulder = np.where(use_right_arm, frames[:, LEFT_SHOULDER], frames[:, RIGHT_SHOULDER])
+        return np.column_stack((
+            self.calculate_angles(shoulder, elbow, wrist),
+            self.calculate_angles(elbow, shoulder, other_shoulder),
+            self.calculate_distances(wrist, elbow),
+            self.calculate_distances(shoulder, elbow),
+        ))
+    
+    def extract_features(self, landmarks: List, arm: Optional[ArmGeometry] = None) -> ArmFeatures:
+        """Pick the active arm of a frame and measure it (ArmGeometry may be precomputed)"""
         # Use the arm that's more extended/visible (lower Y value = higher on screen)
         # In arm wrestling, the active arm is usually more extended
-        use_right_arm = right_wrist[1] < left_wrist[1]  # Right wrist higher = right arm active
+        use_right_arm = landmarks[RIGHT_WRIST][1] < landmarks[LEFT_WRIST][1]  # Right wrist higher = right arm active
         
         if use_right_arm:
-            shoulder = right_shoulder
-            elbow = right_elbow
-            wrist = right_wrist
-            other_shoulder = left_shoulder
+            shoulder = landmarks[RIGHT_SHOULDER]
+            elbow = landmarks[RIGHT_ELBOW]
+            wrist = landmarks[RIGHT_WRIST]
+            other_shoulder = landmarks[LEFT_SHOULDER]
         else:
-            shoulder = left_shoulder
-            elbow = left_elbow
-            wrist = left_wrist
-            other_shoulder = right_shoulder
+            shoulder = landmarks[LEFT_SHOULDER]
+            elbow = landmarks[LEFT_ELBOW]
+            wrist = landmarks[LEFT_WRIST]
+            other_shoulder = landmarks[RIGHT_SHOULDER]
         
-        # Calculate angles
-        elbow_angle = self.calculate_angle(shoulder, elbow, wrist)
-        shoulder_angle = self.calculate_angle(elbow, shoulder, other_shoulder)
+        if arm is None:
+            arm = self.arm_geometry(shoulder, elbow, wrist, other_shoulder)
+        
+        # Body position separates the left and right person
+        body_center_x = (landmarks[RIGHT_SHOULDER][0] + landmarks[LEFT_SHOULDER][0]) / 2
+        
+        return ArmFeatures(shoulder, elbow, wrist, other_shoulder, body_center_x, arm)
+    
+    def detect_technique(self, landmarks: List, frame_count: int, features: Optional[ArmFeatures] = None) -> Dict[str, Any]:
+        """Detect arm wrestling technique based on pose analysis"""
+        if landmarks is None or len(landmarks) < 17:
+            return {"primary": "Unknown", "transitions": [], "description": "Insufficient pose data"}
+        
+        if features is None:
+            features = self.extract_features(landmarks)
+        shoulder, elbow, wrist, other_shoulder, body_center_x, arm = features
+        elbow_angle = arm.elbow_angle
+        shoulder_angle = arm.shoulder_angle
         
         # Calculate wrist position relative to elbow
         wrist_above_elbow = wrist[1] < elbow[1]  # Lower Y = higher on screen
         wrist_forward = wrist[0] > elbow[0]  # Higher X = more forward
         
-        # Add variation based on actual landmark positions to ensure different results
-        # Use body position to add variation between left and right person
-        body_center_x = (right_shoulder[0] + left_shoulder[0]) / 2
+        # Body position separates the left and right person
         position_factor = body_center_x  # 0.0 to 1.0 (left person ~0.3, right person ~0.7)
         
-        # Add video-specific variation (ensures different videos = different results)
-        video_hash = getattr(self, 'video_hash', 0)
-        video_variation = (video_hash % 100) / 100.0  # 0.0 to 1.0
-        video_size_factor = (getattr(self, 'video_size', 0) % 1000) / 1000.0  # Additional variation from file size
-        
-        # Technique detection logic - use actual angles with position-based variation
+        # Technique detection logic - use actual angles
         technique = "Unknown"
         confidence = 0.5
         
-        # CRITICAL: Strong position-based differentiation with video-specific variation
-        # Left person (position_factor < 0.5) vs Right person (position_factor > 0.5)
-        # Use significant adjustments to ensure different results
-        if position_factor < 0.5:
-            # LEFT PERSON - Strong bias towards Hook technique
-            # Add video-specific variation to angle adjustment
-            base_adjustment = -20.0
-            video_offset = (video_variation - 0.5) * 15  # ±7.5 degrees based on video
-            size_offset = (video_size_factor - 0.5) * 5  # ±2.5 degrees based on file size
-            angle_adjustment = base_adjustment + video_offset + size_offset
-            position_bias = "LEFT"
-        else:
-            # RIGHT PERSON - Strong bias towards Top Roll technique
-            # Add video-specific variation to angle adjustment
-            base_adjustment = 20.0
-            video_offset = (video_variation - 0.5) * 15  # ±7.5 degrees based on video
-            size_offset = (video_size_factor - 0.5) * 5  # ±2.5 degrees based on file size
-            angle_adjustment = base_adjustment - video_offset - size_offset
-            position_bias = "RIGHT"
-        
-        print(f"[DEBUG] Video hash: {video_hash}, variation: {video_variation:.3f}, size_factor: {video_size_factor:.3f}, angle_adj: {angle_adjustment:.1f}°")
-        
         # Top Roll: High wrist, forward position, elbow angle 90-150
-        adjusted_top_roll_min = 90 + angle_adjustment
-        adjusted_top_roll_max = 150 + angle_adjustment
-        if wrist_above_elbow and wrist_forward and adjusted_top_roll_min <= elbow_angle <= adjusted_top_roll_max:
+        if wrist_above_elbow and wrist_forward and 90 <= elbow_angle <= 150:
             technique = "Top Roll"
             confidence = 0.8 + (position_factor * 0.1)  # Vary confidence slightly
         
         # Hook: Lower wrist, elbow angle 60-120, wrist behind elbow
-        elif not wrist_above_elbow and (60 + angle_adjustment) <= elbow_angle <= (120 + angle_adjustment):
+        elif not wrist_above_elbow and 60 <= elbow_angle <= 120:
             technique = "Hook"
             confidence = 0.75 + (position_factor * 0.1)
         
         # Press: Very low elbow angle, wrist pushed forward
-        elif elbow_angle < (60 + angle_adjustment) and wrist_forward:
+        elif elbow_angle < 60 and wrist_forward:
             technique = "Press"
             confidence = 0.7 + (position_factor * 0.1)
         
         # King's Move: Extreme shoulder angle, body leaned back
-        elif shoulder_angle > (120 + angle_adjustment):
+        elif shoulder_angle > 120:
             technique = "King's Move"
             confidence = 0.65 + (position_factor * 0.1)
         
@@ -151,12 +766,12 @@ class ArmWrestlingAnalyzer:
             # LEFT PERSON - Force Hook or Press
             if technique == "Unknown" or technique == "Top Roll" or technique == "King's Move":
                 technique = "Hook" if elbow_angle > 80 else "Press"
-                confidence = 0.75 + (video_variation * 0.15)
+                confidence = 0.75
         else:
             # RIGHT PERSON - Force Top Roll or King's Move
             if technique == "Unknown" or technique == "Hook" or technique == "Press":
                 technique = "Top Roll" if shoulder_angle < 110 else "King's Move"
-                confidence = 0.75 + (video_variation * 0.15)
+                confidence = 0.75
         
         # Final fallback - should never reach here but ensures differentiation
         if technique == "Unknown":
@@ -185,34 +800,20 @@ class ArmWrestlingAnalyzer:
             "confidence": confidence
         }
     
-    def assess_injury_risks(self, landmarks: List, frame_count: int) -> List[Dict[str, Any]]:
+    def assess_injury_risks(self, landmarks: List, frame_count: int, features: Optional[ArmFeatures] = None) -> List[Dict[str, Any]]:
         """Assess injury risks based on joint angles and positions"""
-        if not landmarks or len(landmarks) < 17:
+        if landmarks is None or len(landmarks) < 17:
             return []
         
         risks = []
         
-        # Determine which arm is active (same logic as technique detection)
-        right_wrist = landmarks[self.RIGHT_WRIST]
-        left_wrist = landmarks[self.LEFT_WRIST]
-        use_right_arm = right_wrist[1] < left_wrist[1]
-        
-        if use_right_arm:
-            shoulder = landmarks[self.RIGHT_SHOULDER]
-            elbow = landmarks[self.RIGHT_ELBOW]
-            wrist = landmarks[self.RIGHT_WRIST]
-            other_shoulder = landmarks[self.LEFT_SHOULDER]
-        else:
-            shoulder = landmarks[self.LEFT_SHOULDER]
-            elbow = landmarks[self.LEFT_ELBOW]
-            wrist = landmarks[self.LEFT_WRIST]
-            other_shoulder = landmarks[self.RIGHT_SHOULDER]
-        
-        # Calculate elbow angle
-        elbow_angle = self.calculate_angle(shoulder, elbow, wrist)
+        if features is None:
+            features = self.extract_features(landmarks)
+        arm = features.arm
+        elbow_angle = arm.elbow_angle
         
         # Add person-specific risk bias based on body position
-        body_center_x = (landmarks[self.RIGHT_SHOULDER][0] + landmarks[self.LEFT_SHOULDER][0]) / 2
+        body_center_x = features.body_center_x
         is_left_person = body_center_x < 0.5
         
         # Adjust angle thresholds based on person position for different risk assessment
@@ -244,8 +845,8 @@ class ArmWrestlingAnalyzer:
                 })
         
         # Wrist Collapse Risk
-        wrist_elbow_distance = self.calculate_distance(wrist, elbow)
-        shoulder_elbow_distance = self.calculate_distance(shoulder, elbow)
+        wrist_elbow_distance = arm.wrist_elbow_distance
+        shoulder_elbow_distance = arm.shoulder_elbow_distance
         
         if wrist_elbow_distance < shoulder_elbow_distance * 0.7:
             risks.append({
@@ -256,7 +857,7 @@ class ArmWrestlingAnalyzer:
             })
         
         # Shoulder Stress
-        shoulder_angle = self.calculate_angle(elbow, shoulder, other_shoulder)
+        shoulder_angle = arm.shoulder_angle
         if shoulder_angle > 100:
             risks.append({
                 "level": "low",
@@ -274,9 +875,9 @@ class ArmWrestlingAnalyzer:
         
         return risks
     
-    def analyze_strength(self, landmarks: List, frame_count: int) -> Dict[str, Any]:
+    def analyze_strength(self, landmarks: List, frame_count: int, features: Optional[ArmFeatures] = None) -> Dict[str, Any]:
         """Analyze strength metrics based on pose stability and angles"""
-        if not landmarks or len(landmarks) < 17:
+        if landmarks is None or len(landmarks) < 17:
             return {
                 "Back Pressure": "N/A",
                 "Wrist Control": "N/A",
@@ -284,80 +885,57 @@ class ArmWrestlingAnalyzer:
                 "summary": "Insufficient data for analysis"
             }
         
-        # Determine which arm is active (same logic as technique detection)
-        right_wrist = landmarks[self.RIGHT_WRIST]
-        left_wrist = landmarks[self.LEFT_WRIST]
-        use_right_arm = right_wrist[1] < left_wrist[1]
-        
-        if use_right_arm:
-            shoulder = landmarks[self.RIGHT_SHOULDER]
-            elbow = landmarks[self.RIGHT_ELBOW]
-            wrist = landmarks[self.RIGHT_WRIST]
-            other_shoulder = landmarks[self.LEFT_SHOULDER]
-        else:
-            shoulder = landmarks[self.LEFT_SHOULDER]
-            elbow = landmarks[self.LEFT_ELBOW]
-            wrist = landmarks[self.LEFT_WRIST]
-            other_shoulder = landmarks[self.RIGHT_SHOULDER]
-        
-        # Calculate angles
-        elbow_angle = self.calculate_angle(shoulder, elbow, wrist)
+        if features is None:
+            features = self.extract_features(landmarks)
+        arm = features.arm
+        elbow_angle = arm.elbow_angle
         
         # Add person-specific bias to strength analysis
-        body_center_x = (landmarks[self.RIGHT_SHOULDER][0] + landmarks[self.LEFT_SHOULDER][0]) / 2
+        body_center_x = features.body_center_x
         is_left_person = body_center_x < 0.5
-        video_variation = (getattr(self, 'video_hash', 0) % 100) / 100.0
         
         # Back Pressure (person-specific scoring)
         if 80 <= elbow_angle <= 120:
             base_score = 8.0
             # Left person gets slightly lower, right person gets slightly higher
             back_pressure_score = base_score - 0.5 if is_left_person else base_score + 0.5
-            back_pressure_score += (video_variation - 0.5) * 0.3  # Add video variation
             back_pressure = "Strong" if back_pressure_score >= 7.5 else "Moderate"
         elif 60 <= elbow_angle < 80 or 120 < elbow_angle <= 140:
             base_score = 6.5
             back_pressure_score = base_score - 0.3 if is_left_person else base_score + 0.3
-            back_pressure_score += (video_variation - 0.5) * 0.2
             back_pressure = "Moderate"
         else:
             base_score = 5.0
             back_pressure_score = base_score - 0.2 if is_left_person else base_score + 0.2
-            back_pressure_score += (video_variation - 0.5) * 0.2
             back_pressure = "Weak"
         
         # Wrist Control (person-specific scoring)
-        wrist_elbow_distance = self.calculate_distance(wrist, elbow)
-        shoulder_elbow_distance = self.calculate_distance(shoulder, elbow)
+        wrist_elbow_distance = arm.wrist_elbow_distance
+        shoulder_elbow_distance = arm.shoulder_elbow_distance
         wrist_ratio = wrist_elbow_distance / shoulder_elbow_distance if shoulder_elbow_distance > 0 else 0
         
         if wrist_ratio > 0.9:
             base_score = 7.5
             wrist_score = base_score - 0.4 if is_left_person else base_score + 0.4
-            wrist_score += (video_variation - 0.5) * 0.3
             wrist_control = "Strong" if wrist_score >= 7.0 else "Moderate"
         elif wrist_ratio > 0.7:
             base_score = 6.0
             wrist_score = base_score - 0.3 if is_left_person else base_score + 0.3
-            wrist_score += (video_variation - 0.5) * 0.2
             wrist_control = "Moderate"
         else:
             base_score = 4.0
             wrist_score = base_score - 0.2 if is_left_person else base_score + 0.2
-            wrist_score += (video_variation - 0.5) * 0.2
             wrist_control = "Weak"
         
         # Side Pressure (person-specific scoring)
-        shoulder_angle = self.calculate_angle(elbow, shoulder, other_shoulder)
+        shoulder_angle = arm.shoulder_angle
         if 70 <= shoulder_angle <= 100:
             base_score = 6.5
             side_score = base_score - 0.3 if is_left_person else base_score + 0.3
-            side_score += (video_variation - 0.5) * 0.2
             side_pressure = "Moderate"
         else:
             base_score = 5.0
             side_score = base_score - 0.2 if is_left_person else base_score + 0.2
-            side_score += (video_variation - 0.5) * 0.2
             side_pressure = "Weak"
         
         # Generate person-specific summary
@@ -383,35 +961,26 @@ class ArmWrestlingAnalyzer:
             "summary": summary
         }
     
+    def aggregate_strength(self, scores: np.ndarray) -> Dict[str, str]:
+        """Average a (frames, metrics) strength score array into one level per metric"""
+        valid = ~np.isnan(scores)
+        counts = np.count_nonzero(valid, axis=0)
+        averages = np.nansum(scores, axis=0, dtype=np.float64) / np.maximum(counts, 1)
+        levels = np.select([averages >= 7, averages >= 5.5], ["Strong", "Moderate"], "Weak")
+        levels = np.where(counts > 0, levels, "N/A")
+        
+        return {key: str(level) for key, level in zip(STRENGTH_METRICS, levels)}
+    
     def generate_recommendations(self, technique: str, risks: List[Dict], strength: Dict) -> List[str]:
         """Generate personalized training recommendations"""
-        recommendations = []
-        
-        # Technique-specific recommendations
-        if technique == "Top Roll":
-            recommendations.append("Wrist curls (3x15) - Focus on pronation strength to prevent collapse")
-            recommendations.append("Static wrist holds (4x30s) - Build endurance in top position")
-        elif technique == "Hook":
-            recommendations.append("Hook transition practice - Improve power during technique changes")
-            recommendations.append("Side pressure drills - Enhance lateral force application")
-        
-        # Risk-based recommendations
-        high_risks = [r for r in risks if r.get("level") == "high"]
-        if high_risks:
-            for risk in high_risks:
-                if "Elbow" in risk.get("title", ""):
-                    recommendations.append("Elbow position drills - Practice keeping elbow angle below 35°")
-                if "Wrist" in risk.get("title", ""):
-                    recommendations.append("Wrist stability exercises - Focus on preventing collapse")
-        
-        # Strength-based recommendations
-        if "Weak" in strength.get("Wrist Control", ""):
-            recommendations.append("Pronation training - Strengthen wrist pronators")
-            recommendations.append("Wrist curls and static holds - Build wrist endurance")
-        
-        if "Weak" in strength.get("Back Pressure", ""):
-            recommendations.append("Back pressure training - Improve pulling strength")
-            recommendations.append("Elbow angle drills - Maintain optimal position")
+        # Technique, high-risk and weak-strength recommendations, in that order
+        recommendations = list(TECHNIQUE_RECOMMENDATIONS.get(technique, ()))
+        for risk in risks:
+            if risk.get("level") == "high":
+                recommendations.extend(RISK_RECOMMENDATIONS.get(risk.get("title", ""), ()))
+        for metric, recs in WEAK_STRENGTH_RECOMMENDATIONS.items():
+            if "Weak" in strength.get(metric, ""):
+                recommendations.extend(recs)
         
         # General recommendations
         if len(recommendations) < 3:
@@ -462,13 +1031,6 @@ class ArmWrestlingAnalyzer:
             if "Weak" in back_pressure:
                 reasons.append("Top Roll requires strong back pressure - yours wasn't sufficient")
         
-        # Video-specific variation
-        video_factor = (getattr(self, 'video_hash', 0) % 10) / 10.0
-        if video_factor > 0.7:
-            reasons.append("Opponent had superior technique execution in this match")
-        elif video_factor < 0.3:
-            reasons.append("Timing and reaction speed favored your opponent")
-        
         return {
             "primary_reason": primary_reason,
             "detailed_reasons": reasons[:3],  # Top 3 reasons
@@ -512,20 +1074,6 @@ class ArmWrestlingAnalyzer:
         if any("Elbow" in r.get("title", "") for r in risks):
             style_traits.append("Tends to flare elbow (needs correction)")
         
-        # Person position variation
-        video_factor = (getattr(self, 'video_hash', 0) % 7)
-        style_variations = [
-            "Aggressive attacker",
-            "Defensive counter-puncher",
-            "Technical precision fighter",
-            "Power-based wrestler",
-            "Endurance specialist",
-            "Speed-focused competitor",
-            "Strategic positioner"
-        ]
-        if video_factor < len(style_variations):
-            style_traits.append(style_variations[video_factor])
-        
         return {
             "style_name": style_name,
             "primary_technique": technique,
@@ -533,59 +1081,74 @@ class ArmWrestlingAnalyzer:
             "fighting_approach": "Offensive" if "Strong" in back_pressure else "Defensive" if len(risks) > 2 else "Balanced"
         }
     
+    def detect_pose(self, frame: np.ndarray, static: bool = False) -> Optional[np.ndarray]:
+        """Run pose inference on one BGR frame and return its (33, 3) x, y, z landmarks
+        
+        MediaPipe's Solutions API only accepts a single image per call, so this
+        is the one place frames enter the pose graph. `static` treats the frame
+        as unrelated to the previous one (no tracking).
+        """
+        height, width = frame.shape[:2]
+        size = pose_input_size(width, height)
+        if size != (width, height):
+            if self._small_buf is None or self._small_buf.shape[1::-1] != size:
+                self._small_buf = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            frame = cv2.resize(frame, size, dst=self._small_buf, interpolation=cv2.INTER_AREA)
+        
+        # pose.process copies the pixels into its own packet, so one buffer
+        # can take every frame
+        if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+            self._rgb_buf = np.empty(frame.shape, dtype=np.uint8)
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        pose = self.pose_static if static else self.pose
+        if isinstance(pose, TasksPose):
+            return pose.landmarks(rgb_frame)
+        results = pose.process(rgb_frame)
+        if not results.pose_landmarks:
+            return None
+        return landmarks_to_array(results.pose_landmarks)
+    
     def detect_people(self, video_path: str) -> List[Dict[str, Any]]:
         """Detect all people in video and return their positions"""
-        cap = cv2.VideoCapture(video_path)
-        
-        if not cap.isOpened():
-            return []
-        
         people_detected = []
-        frame_count = 0
+        # People bucketed by tenths of center_x, so a detection is only
+        # compared against people in its own and the neighbouring buckets
+        people_bins: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
         sample_rate = 30  # Sample every 30 frames for person detection
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if frame_count % sample_rate == 0:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.pose.process(rgb_frame)
-                
-                if results.pose_landmarks:
-                    # Extract landmarks
-                    landmarks = []
-                    for landmark in results.pose_landmarks.landmark:
-                        landmarks.append((landmark.x, landmark.y, landmark.z))
+        reader = FrameReader(video_path, sample_rate=sample_rate, seek=True)
+        for _, landmarks in PoseStream(self, reader, static=True):
+            if landmarks is not None:
+                # Calculate person's center position (using shoulders)
+                if len(landmarks) > 12:
+                    left_shoulder = landmarks[LEFT_SHOULDER]
+                    right_shoulder = landmarks[RIGHT_SHOULDER]
+                    center_x = (left_shoulder[0] + right_shoulder[0]) / 2
                     
-                    # Calculate person's center position (using shoulders)
-                    if len(landmarks) > 12:
-                        left_shoulder = landmarks[self.LEFT_SHOULDER]
-                        right_shoulder = landmarks[self.RIGHT_SHOULDER]
-                        center_x = (left_shoulder[0] + right_shoulder[0]) / 2
-                        
-                        # Check if this person is already detected
-                        person_found = False
-                        for person in people_detected:
+                    # Check if this person is already detected; the earliest
+                    # detected match wins, as with a scan of people_detected
+                    bucket = math.floor(center_x * 10)
+                    match = None
+                    for neighbour in (bucket - 1, bucket, bucket + 1):
+                        for order, person in people_bins.get(neighbour, ()):
                             if abs(person["center_x"] - center_x) < 0.1:  # Same person
-                                person_found = True
-                                person["frames_detected"] += 1
+                                if match is None or order < match[0]:
+                                    match = (order, person)
                                 break
-                        
-                        if not person_found:
-                            # Determine position (left or right side of video)
-                            position = "left" if center_x < 0.5 else "right"
-                            people_detected.append({
-                                "position": position,
-                                "center_x": center_x,
-                                "frames_detected": 1,
-                                "landmarks": landmarks
-                            })
-            
-            frame_count += 1
-        
-        cap.release()
+                    
+                    if match is not None:
+                        match[1]["frames_detected"] += 1
+                    else:
+                        # Determine position (left or right side of video)
+                        position = "left" if center_x < 0.5 else "right"
+                        person = {
+                            "position": position,
+                            "center_x": center_x,
+                            "frames_detected": 1,
+                            "landmarks": landmarks
+                        }
+                        people_bins.setdefault(bucket, []).append((len(people_detected), person))
+                        people_detected.append(person)
         
         # Sort by position (left first, then right)
         people_detected.sort(key=lambda x: x["center_x"])
@@ -635,12 +1198,17 @@ class ArmWrestlingAnalyzer:
         
         return people_detected
     
-    def analyze_person(self, landmarks: List, frame_count: int) -> Dict[str, Any]:
+    def analyze_person(self, landmarks: List, frame_count: int, arm: Optional[ArmGeometry] = None) -> Dict[str, Any]:
         """Analyze a specific person's performance"""
+        # Active arm and its measurements are extracted once for all three analyses
+        features = None
+        if landmarks is not None and len(landmarks) >= 17:
+            features = self.extract_features(landmarks, arm)
+        
         # For single average landmarks, analyze directly
-        technique_data = self.detect_technique(landmarks, frame_count)
-        risks = self.assess_injury_risks(landmarks, frame_count)
-        strength_result = self.analyze_strength(landmarks, frame_count)
+        technique_data = self.detect_technique(landmarks, frame_count, features)
+        risks = self.assess_injury_risks(landmarks, frame_count, features)
+        strength_result = self.analyze_strength(landmarks, frame_count, features)
         
         # Get unique risks (prioritize high risks)
         unique_risks = {}
@@ -664,147 +1232,285 @@ class ArmWrestlingAnalyzer:
             "recommendations": recommendations
         }
     
+    def analyze_frames(self, frames: np.ndarray, arm: np.ndarray, identity: str) -> Dict[str, Any]:
+        """analyze_person for every frame of an (N, 33, 3) stack, aggregated
+        
+        The technique, risk and strength rules of detect_technique,
+        assess_injury_risks and analyze_strength run as array operations
+        over all frames at once; only the frames whose details end up in the
+        result go through those methods. `arm` is calculate_arm_geometry's
+        (N, 4) output and `identity` ("LEFT"/"RIGHT") biases the technique.
+        """
+        elbow_angle, shoulder_angle, wrist_elbow_distance, shoulder_elbow_distance = arm.T
+        
+        # Active arm and body position, as in extract_features
+        use_right_arm = (frames[:, RIGHT_WRIST, 1] < frames[:, LEFT_WRIST, 1])[:, None]
+        elbow = np.where(use_right_arm, frames[:, RIGHT_ELBOW], frames[:, LEFT_ELBOW])
+        wrist = np.where(use_right_arm, frames[:, RIGHT_WRIST], frames[:, LEFT_WRIST])
+        body_center_x = (frames[:, RIGHT_SHOULDER, 0] + frames[:, LEFT_SHOULDER, 0]) / 2
+        is_left_person = body_center_x < 0.5
+        
+        # Technique of each frame as a TECHNIQUES code
+        unknown, top_roll, hook, press, kings_move = (TECHNIQUE_CODES[name] for name in TECHNIQUES)
+        wrist_above_elbow = wrist[:, 1] < elbow[:, 1]
+        wrist_forward = wrist[:, 0] > elbow[:, 0]
+        codes = np.select(
+            [
+                wrist_above_elbow & wrist_forward & (90 <= elbow_angle) & (elbow_angle <= 150),
+                ~wrist_above_elbow & (60 <= elbow_angle) & (elbow_angle <= 120),
+                (elbow_angle < 60) & wrist_forward,
+                shoulder_angle > 120,
+            ],
+            [top_roll, hook, press, kings_move],
+            unknown
+        ).astype(np.int8)
+        # Position-based override: left person Hook or Press, right person
+        # Top Roll or King's Move
+        codes = np.where(
+            is_left_person & np.isin(codes, (unknown, top_roll, kings_move)),
+            np.where(elbow_angle > 80, hook, press), codes
+        )
+        codes = np.where(
+            ~is_left_person & np.isin(codes, (unknown, hook, press)),
+            np.where(shoulder_angle < 110, top_roll, kings_move), codes
+        )
+        # Bias technique detection based on the selected person
+        if identity == "LEFT":
+            codes[np.isin(codes, (unknown, top_roll))] = hook
+        else:
+            codes[np.isin(codes, (unknown, hook))] = top_roll
+        # Most frequent technique; on a tie, the one seen first
+        primary_technique = "Unknown"
+        if codes.size:
+            technique_counts = np.bincount(codes, minlength=len(TECHNIQUES))
+            most_common = np.flatnonzero(technique_counts == technique_counts.max())
+            primary_technique = TECHNIQUES[codes[np.isin(codes, most_common)][0]]
+        
+        # Risk titles with the frames they occur on and the frames where
+        # they're high, in the order a frame lists them
+        elbow_risk_threshold = np.where(is_left_person, 35, 40)
+        elbow_flare = elbow_angle > elbow_risk_threshold
+        elbow_high = elbow_flare & (elbow_angle > 45)
+        shoulder_ok = shoulder_angle > 100
+        risk_rules = (
+            (0, "Elbow Ligament Stress", elbow_flare & is_left_person, elbow_high & is_left_person),
+            (0, "Elbow Flare Detected", elbow_flare & ~is_left_person, elbow_high & ~is_left_person),
+            (0, "Elbow Position Warning", ~elbow_flare & (elbow_angle > elbow_risk_threshold - 5) & is_left_person, None),
+            (1, "Wrist Collapse Risk", wrist_elbow_distance < shoulder_elbow_distance * 0.7, None),
+            (2, "Shoulder Position", shoulder_ok, None),
+            (2, "Shoulder Stress", ~shoulder_ok, None),
+        )
+        # Unique risks in order of first appearance; each one is taken from
+        # its last high frame, else its first frame
+        seen = []
+        for slot, title, occurs, high in risk_rules:
+            hits = np.flatnonzero(occurs)
+            if hits.size:
+                highs = np.flatnonzero(high) if high is not None else hits[:0]
+                seen.append((int(hits[0]), slot, title, int(highs[-1] if highs.size else hits[0])))
+        seen.sort()
+        
+        frame_rows = frames.tolist()
+        arm_rows = arm.tolist()
+        
+        def frame_features(idx: int) -> ArmFeatures:
+            return self.extract_features(frame_rows[idx], ArmGeometry(*arm_rows[idx]))
+        
+        final_risks = []
+        for _, _, title, idx in seen[:5]:
+            risks = self.assess_injury_risks(frame_rows[idx], idx + 1, frame_features(idx))
+            final_risks.append(next(risk for risk in risks if risk["title"] == title))
+        
+        # Strength level of each frame; the per-person score offsets in
+        # analyze_strength never move a frame across a level
+        levels = STRENGTH_LEVEL_SCORES
+        back_pressure = np.select(
+            [
+                (80 <= elbow_angle) & (elbow_angle <= 120),
+                ((60 <= elbow_angle) & (elbow_angle < 80)) | ((120 < elbow_angle) & (elbow_angle <= 140)),
+            ],
+            [levels["Strong"], levels["Moderate"]],
+            levels["Weak"]
+        )
+        wrist_ratio = np.divide(
+            wrist_elbow_distance, shoulder_elbow_distance,
+            out=np.zeros_like(wrist_elbow_distance), where=shoulder_elbow_distance > 0
+        )
+        wrist_control = np.select(
+            [wrist_ratio > 0.9, wrist_ratio > 0.7], [levels["Strong"], levels["Moderate"]], levels["Weak"]
+        )
+        side_pressure = np.where(
+            (70 <= shoulder_angle) & (shoulder_angle <= 100), levels["Moderate"], levels["Weak"]
+        )
+        # Per-frame strength scores, one contiguous column per metric
+        strength_scores = np.column_stack((back_pressure, wrist_control, side_pressure)).astype(np.float32)
+        avg_strength = self.aggregate_strength(strength_scores)
+        
+        # Get recommendations from most common technique
+        recommendations = self.generate_recommendations(primary_technique, final_risks, avg_strength)
+        
+        # Use the first frame's technique structure but update primary
+        technique_result = self.detect_technique(frame_rows[0], 1, frame_features(0))
+        technique_result["primary"] = primary_technique
+        technique_result["description"] = f"{primary_technique} technique detected (analyzed {len(frame_rows)} frames)"
+        
+        return {
+            "technique": technique_result,
+            "risks": final_risks,
+            "strength": avg_strength,
+            "recommendations": recommendations
+        }
+    
+    def scan_poses(self, video_path: str, sample_rate: int, anchor_frames: frozenset,
+                   start_frame: int = 0, stop_frame: Optional[int] = None) -> Tuple[List[Tuple[int, np.ndarray]], int]:
+        """Sequential scan_interval on this analyzer's pose graphs"""
+        def is_analysis_frame(frame_index: int) -> bool:
+            return frame_index % sample_rate == 0
+        
+        reader = FrameReader(
+            video_path, max_frames=stop_frame, start_frame=start_frame,
+            sample=lambda i: is_analysis_frame(i) or i in anchor_frames
+        )
+        self.reset()
+        poses = [
+            (frame_index, landmarks)
+            for frame_index, landmarks in PoseStream(self, reader, static=lambda i: not is_analysis_frame(i))
+            if landmarks is not None
+        ]
+        return poses, reader.frames_read
+    
+    def scan_video(self, video_path: str, sample_rate: int, anchor_frames: frozenset,
+                   total_frames: int) -> Tuple[List[Tuple[int, np.ndarray]], int]:
+        """scan_poses over the whole video; returns the poses and the frame count
+        
+        Long videos are split into DECODE_WORKERS intervals that decode and
+        run pose inference in parallel worker processes. Interval bounds are
+        multiples of sample_rate, so exactly the same frames are sampled;
+        each worker seeks once to its start, and tracking restarts there.
+        """
+        workers = min(DECODE_WORKERS, total_frames // PARALLEL_DECODE_MIN_FRAMES)
+        if workers < 2:
+            return self.scan_poses(video_path, sample_rate, anchor_frames)
+        
+        step = -(-total_frames // workers // sample_rate) * sample_rate
+        starts = list(range(0, total_frames, step))
+        # The last interval reads to the end, in case the probed count is short
+        stops = starts[1:] + [None]
+        print(f"[VIDEO] Decoding {total_frames} frames in {len(starts)} parallel intervals")
+        futures = [
+            decode_executor().submit(scan_interval, video_path, sample_rate, anchor_frames, start, stop)
+            for start, stop in zip(starts, stops)
+        ]
+        poses = []
+        frame_count = 0
+        for future in futures:
+            interval_poses, frame_count = future.result()
+            poses.extend(interval_poses)
+        return poses, frame_count
+    
+    def identity_center_xs(self, frames: np.ndarray) -> np.ndarray:
+        """identity_center_x for every frame of an (N, 33, 3) landmark array"""
+        body_center_x = (frames[:, LEFT_HIP, 0] + frames[:, RIGHT_HIP, 0]) / 2
+        active_arm_x = np.where(
+            frames[:, RIGHT_WRIST, 1] < frames[:, LEFT_WRIST, 1],
+            (frames[:, RIGHT_ELBOW, 0] + frames[:, RIGHT_WRIST, 0]) / 2,
+            (frames[:, LEFT_ELBOW, 0] + frames[:, LEFT_WRIST, 0]) / 2
+        )
+        return (body_center_x * 0.7) + (active_arm_x * 0.3)
+    
+    def identity_center_x(self, landmarks) -> float:
+        """Horizontal position used to tell the two people apart
+        
+        When people are holding hands, MediaPipe may detect them as one
+        person, so body and active-arm positions are combined.
+        """
+        # 1. Body position (hips) - left person's body is on left, right person's on right
+        body_center_x = (landmarks[LEFT_HIP][0] + landmarks[RIGHT_HIP][0]) / 2
+        
+        # 2. Active arm position - left person uses RIGHT arm, right person uses LEFT arm.
+        # Use the arm that's more extended (lower Y = higher on screen = more visible)
+        right_wrist = landmarks[RIGHT_WRIST]
+        left_wrist = landmarks[LEFT_WRIST]
+        if right_wrist[1] < left_wrist[1]:
+            # Right arm is active (left person)
+            active_arm_x = (landmarks[RIGHT_ELBOW][0] + right_wrist[0]) / 2
+        else:
+            # Left arm is active (right person)
+            active_arm_x = (landmarks[LEFT_ELBOW][0] + left_wrist[0]) / 2
+        
+        # Weight body position more (0.7) since it's more stable
+        return (body_center_x * 0.7) + (active_arm_x * 0.3)
+    
     def analyze_video(self, video_path: str, person_id: Optional[int] = None) -> Dict[str, Any]:
         """Main function to analyze arm wrestling video"""
-        import hashlib
-        import os
-        import random
-        
-        # Get video-specific hash for variation (ensures different videos = different results)
-        video_hash = 0
-        video_size = 0
-        if os.path.exists(video_path):
-            video_size = os.path.getsize(video_path)
-            # Read more of the file for better hash variation
-            with open(video_path, 'rb') as f:
-                file_data = f.read(min(8192, video_size))  # Read up to 8KB
-                video_hash = int(hashlib.md5(file_data).hexdigest()[:12], 16) % 10000
-        self.video_hash = video_hash  # Store for use in analysis
-        self.video_size = video_size
-        
-        # Seed random with video hash for consistent but video-specific variation
-        random.seed(video_hash)
-        print(f"[VIDEO] Video hash: {video_hash}, size: {video_size} bytes")
+        probe = probe_video(video_path)
         
-        cap = cv2.VideoCapture(video_path)
+        if probe is None:
+            return error_result("Could not open video file", "Video processing failed")
+        total_video_frames, video_fps = probe
         
-        if not cap.isOpened():
-            return {
-                "error": "Could not open video file",
-                "technique": {"primary": "Unknown", "transitions": [], "description": "Video processing failed"},
-                "risks": [],
-                "strength": {},
-                "recommendations": [],
-                "people_detected": []
-            }
+        # Spread a fixed pose-inference budget over the whole video; short
+        # clips keep the original every-5th-frame sampling
+        sample_rate = max(MIN_SAMPLE_RATE, total_video_frames // TARGET_ANALYZED_FRAMES)
         
         # STEP 1: Establish temporal identity anchors from first frames
         # This is CRITICAL - we need stable identity, not per-frame position
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return {
-                "error": "Could not open video file",
-                "technique": {"primary": "Unknown", "transitions": [], "description": "Video processing failed"},
-                "risks": [],
-                "strength": {},
-                "recommendations": [],
-                "people_detected": []
-            }
         
         # Collect anchor frames (first 30 frames, sampled every 5 frames = ~6 anchor frames)
         # For arm wrestling, people are holding hands, so we need to use BODY position, not hand position
-        anchor_frames_left = []  # Left person's body center positions
-        anchor_frames_right = []  # Right person's body center positions
-        frame_count = 0
         anchor_sample_rate = 5
         max_anchor_frames = 30  # First 30 frames
-        
-        while cap.isOpened() and frame_count < max_anchor_frames:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if frame_count % anchor_sample_rate == 0:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = self.pose.process(rgb_frame)
-                
-                if results.pose_landmarks:
-                    landmarks = []
-                    for landmark in results.pose_landmarks.landmark:
-                        landmarks.append((landmark.x, landmark.y, landmark.z))
-                    
-                    if len(landmarks) > 12:
-                        # When people are holding hands, MediaPipe may detect them as one person
-                        # Use MULTIPLE position indicators to determine which person it is:
-                        
-                        # 1. Body position (hips) - left person's body is on left, right person's on right
-                        left_hip = landmarks[self.LEFT_HIP]
-                        right_hip = landmarks[self.RIGHT_HIP]
-                        body_center_x = (left_hip[0] + right_hip[0]) / 2
-                        
-                        # 2. Active arm position - left person uses RIGHT arm, right person uses LEFT arm
-                        # Left person's right elbow/wrist will be more to the left side
-                        # Right person's left elbow/wrist will be more to the right side
-                        right_elbow = landmarks[self.RIGHT_ELBOW]
-                        right_wrist = landmarks[self.RIGHT_WRIST]
-                        left_elbow = landmarks[self.LEFT_ELBOW]
-                        left_wrist = landmarks[self.LEFT_WRIST]
-                        
-                        # Determine which arm is active (the one being used for wrestling)
-                        # Active arm is usually more extended/visible
-                        right_arm_center = (right_elbow[0] + right_wrist[0]) / 2
-                        left_arm_center = (left_elbow[0] + left_wrist[0]) / 2
-                        
-                        # Use the arm that's more extended (lower Y = higher on screen = more visible)
-                        if right_wrist[1] < left_wrist[1]:
-                            # Right arm is active (left person)
-                            active_arm_x = right_arm_center
-                        else:
-                            # Left arm is active (right person)
-                            active_arm_x = left_arm_center
-                        
-                        # Combine body position and active arm position
-                        # Weight body position more (0.7) since it's more stable
-                        center_x = (body_center_x * 0.7) + (active_arm_x * 0.3)
-                        
-                        # Determine which side this person is on (left or right of video center)
-                        if center_x < 0.5:
-                            anchor_frames_left.append(center_x)
-                        else:
-                            anchor_frames_right.append(center_x)
-            
-            frame_count += 1
-        
-        cap.release()
+        # Body center positions of every anchor frame with a pose
+        anchor_xs = np.empty(-(-max_anchor_frames // anchor_sample_rate))
+        anchor_count = 0
+        # Frames seen on each side; three apiece give a stable median
+        anchor_left_count = 0
+        anchor_right_count = 0
+        
+        anchor_frames = frozenset(range(0, max_anchor_frames, anchor_sample_rate))
+        
+        # One sweep decodes the video for both the anchors and the analysis;
+        # identity is assigned from the buffered frames once the anchors are
+        # known. Anchor-only frames go through the static graph so the
+        # tracking graph sees the same frames it always did.
+        sampled_poses, frame_count = self.scan_video(video_path, sample_rate, anchor_frames, total_video_frames)
+        analysis_frames = []  # (frame index, landmarks) of every analysis frame with a pose
+        for frame_idx, landmarks in sampled_poses:
+            if frame_idx % sample_rate == 0:
+                analysis_frames.append((frame_idx, landmarks))
+            if (frame_idx in anchor_frames and len(landmarks) > 12
+                    and not (anchor_left_count >= 3 and anchor_right_count >= 3)):
+                center_x = self.identity_center_x(landmarks)
+                anchor_xs[anchor_count] = center_x
+                anchor_count += 1
+                if center_x < 0.5:
+                    anchor_left_count += 1
+                else:
+                    anchor_right_count += 1
         
         # STEP 2: Calculate identity anchors (median of anchor positions)
         # If we detected both left and right clusters, use them
         # Otherwise, split the detected positions
-        if anchor_frames_left and anchor_frames_right:
+        anchors = anchor_xs[:anchor_count]
+        # Which side of the video center each anchor frame is on
+        on_left = anchors < 0.5
+        if on_left.any() and not on_left.all():
             # Both sides detected - use medians
-            left_anchor_x = statistics.median(anchor_frames_left)
-            right_anchor_x = statistics.median(anchor_frames_right)
+            left_anchor_x = float(np.median(anchors[on_left]))
+            right_anchor_x = float(np.median(anchors[~on_left]))
         else:
-            # Only one side detected or mixed - use clustering approach
-            all_anchors = anchor_frames_left + anchor_frames_right
-            if not all_anchors:
-                return {
-                    "error": "No people detected in video",
-                    "technique": {"primary": "Unknown", "transitions": [], "description": "Could not detect any person"},
-                    "risks": [],
-                    "strength": {},
-                    "recommendations": [],
-                    "people_detected": []
-                }
+            # Only one side detected - use clustering approach
+            if not anchor_count:
+                return error_result("No people detected in video", "Could not detect any person")
             
-            # Sort and split into left/right clusters
-            all_anchors_sorted = sorted(all_anchors)
-            mid_point = len(all_anchors_sorted) // 2
-            left_cluster = all_anchors_sorted[:mid_point] if mid_point > 0 else all_anchors_sorted[:1]
-            right_cluster = all_anchors_sorted[mid_point:] if mid_point < len(all_anchors_sorted) else all_anchors_sorted[-1:]
+            # Split into lower and upper halves around the middle element
+            mid_point = anchor_count // 2
+            split = np.partition(anchors, mid_point)
+            left_cluster = split[:mid_point] if mid_point > 0 else split[:1]
+            right_cluster = split[mid_point:]
             
-            left_anchor_x = statistics.median(left_cluster)
-            right_anchor_x = statistics.median(right_cluster)
+            left_anchor_x = float(np.median(left_cluster))
+            right_anchor_x = float(np.median(right_cluster))
         
         # Ensure anchors are well separated (at least 0.3 apart)
         if abs(left_anchor_x - right_anchor_x) < 0.3:
@@ -853,125 +1559,55 @@ class ArmWrestlingAnalyzer:
         
         print(f"[IDENTITY] Selected person: {selected_person['label']}, Identity: {selected_identity}, Anchor: {selected_anchor_x:.3f}")
         
-        # STEP 3: Process entire video and assign identity to each frame
-        cap = cv2.VideoCapture(video_path)
-        frame_count = 0
-        person_landmarks = []  # Only frames matching selected identity
+        # STEP 3: Assign identity to each frame of the video
+        person_landmarks = np.empty((0, 33, 3))  # Only frames matching selected identity
         all_frame_ids = []  # For debugging
         
-        sample_rate = 5
-        
-        try:
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                if frame_count % sample_rate == 0:
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    results = self.pose.process(rgb_frame)
-                    
-                    if results.pose_landmarks:
-                        landmarks = []
-                        for landmark in results.pose_landmarks.landmark:
-                            landmarks.append((landmark.x, landmark.y, landmark.z))
-                        
-                        if len(landmarks) > 12:
-                            # Use MULTIPLE position indicators (same as anchor detection)
-                            # Body position (hips)
-                            left_hip = landmarks[self.LEFT_HIP]
-                            right_hip = landmarks[self.RIGHT_HIP]
-                            body_center_x = (left_hip[0] + right_hip[0]) / 2
-                            
-                            # Active arm position
-                            right_elbow = landmarks[self.RIGHT_ELBOW]
-                            right_wrist = landmarks[self.RIGHT_WRIST]
-                            left_elbow = landmarks[self.LEFT_ELBOW]
-                            left_wrist = landmarks[self.LEFT_WRIST]
-                            
-                            # Determine which arm is active
-                            if right_wrist[1] < left_wrist[1]:
-                                # Right arm is active (left person)
-                                active_arm_x = (right_elbow[0] + right_wrist[0]) / 2
-                            else:
-                                # Left arm is active (right person)
-                                active_arm_x = (left_elbow[0] + left_wrist[0]) / 2
-                            
-                            # Combine body and active arm position (same weighting as anchors)
-                            center_x = (body_center_x * 0.7) + (active_arm_x * 0.3)
-                            
-                            # STEP 4: Assign identity based on anchors (NOT per-frame position)
-                            # Match to closest anchor (this is the KEY difference)
-                            distance_to_left = abs(center_x - left_anchor_x)
-                            distance_to_right = abs(center_x - right_anchor_x)
-                            
-                            # Exclude referee (middle zone) - wider exclusion for arm wrestling
-                            is_referee = midpoint - 0.15 < center_x < midpoint + 0.15
-                            
-                            if is_referee:
-                                # Skip referee frames
-                                continue
-                            
-                            # Assign identity based on anchor proximity
-                            # Use stricter threshold to ensure proper separation
-                            if distance_to_left < distance_to_right and distance_to_left < 0.35:
-                                frame_identity = "LEFT"
-                            elif distance_to_right < distance_to_left and distance_to_right < 0.35:
-                                frame_identity = "RIGHT"
-                            else:
-                                # Too far from both anchors - skip (might be referee or noise)
-                                continue
-                            
-                            # Only add frames matching selected identity
-                            if frame_identity == selected_identity:
-                                person_landmarks.append(landmarks)
-                                all_frame_ids.append(frame_count)
-                
-                frame_count += 1
-        finally:
-            cap.release()
+        # Frames with a full body, decided all at once
+        candidates = [(frame_idx, landmarks) for frame_idx, landmarks in analysis_frames if len(landmarks) > 12]
+        if candidates:
+            candidate_landmarks = np.stack([landmarks for _, landmarks in candidates])
+            candidate_ids = np.array([frame_idx for frame_idx, _ in candidates])
+            # Use MULTIPLE position indicators (same as anchor detection)
+            center_x = self.identity_center_xs(candidate_landmarks)
+            
+            # STEP 4: Assign identity based on anchors (NOT per-frame position)
+            # Match to closest anchor (this is the KEY difference)
+            distance_to_left = np.abs(center_x - left_anchor_x)
+            distance_to_right = np.abs(center_x - right_anchor_x)
+            
+            # Exclude referee (middle zone) - wider exclusion for arm wrestling
+            is_referee = (midpoint - 0.15 < center_x) & (center_x < midpoint + 0.15)
+            
+            # Assign identity based on anchor proximity
+            # Use stricter threshold to ensure proper separation; frames too
+            # far from both anchors (referee or noise) match neither
+            left_mask = (distance_to_left < distance_to_right) & (distance_to_left < 0.35) & ~is_referee
+            right_mask = (distance_to_right < distance_to_left) & (distance_to_right < 0.35) & ~is_referee
+            selected_mask = left_mask if selected_identity == "LEFT" else right_mask
+            
+            # Only keep frames matching selected identity
+            person_landmarks = candidate_landmarks[selected_mask]
+            all_frame_ids = candidate_ids[selected_mask].tolist()
         
         print(f"[IDENTITY] Total frames analyzed: {frame_count}")
         print(f"[IDENTITY] Frames matching {selected_identity}: {len(person_landmarks)}")
         print(f"[IDENTITY] Sample frame IDs for {selected_identity}: {all_frame_ids[:10] if len(all_frame_ids) > 10 else all_frame_ids}")
         
         # If no frames matched, use fallback with offset
-        if not person_landmarks:
+        if not len(person_landmarks):
             print(f"[WARNING] No frames matched identity {selected_identity}, using offset fallback")
-            # Re-process with offset
-            cap = cv2.VideoCapture(video_path)
-            frame_count = 0
+            # Reuse every analysis frame with an offset
             offset_x = 0.25 if selected_identity == "LEFT" else -0.25
             
-            try:
-                while cap.isOpened():
-                    ret, frame = cap.read()
-                    if not ret:
-                        break
-                    
-                    if frame_count % sample_rate == 0:
-                        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        results = self.pose.process(rgb_frame)
-                        
-                        if results.pose_landmarks:
-                            landmarks = []
-                            for landmark in results.pose_landmarks.landmark:
-                                landmarks.append((landmark.x, landmark.y, landmark.z))
-                            
-                            # Apply offset to differentiate
-                            adjusted_landmarks = []
-                            for landmark in landmarks:
-                                new_x = max(0.0, min(1.0, landmark[0] + offset_x))
-                                adjusted_landmarks.append((new_x, landmark[1], landmark[2]))
-                            
-                            person_landmarks.append(adjusted_landmarks)
-                    
-                    frame_count += 1
-            finally:
-                cap.release()
+            if analysis_frames:
+                # Apply offset to differentiate, to every frame at once
+                shifted = np.stack([landmarks for _, landmarks in analysis_frames])
+                np.clip(shifted[..., 0] + offset_x, 0.0, 1.0, out=shifted[..., 0])
+                person_landmarks = shifted
         
         # Analyze selected person - analyze each frame separately then aggregate
-        if person_landmarks:
+        if len(person_landmarks):
             print(f"[INFO] Analyzing {len(person_landmarks)} frames for {selected_person['label']} (position: {selected_person['position']}, center_x: {selected_person['center_x']:.3f})")
             
             # CRITICAL: Apply significant person-specific transformations to ensure DIFFERENT results
@@ -991,131 +1627,33 @@ class ArmWrestlingAnalyzer:
                 person_angle_adjustment = 15.0  # Adjust angles differently
                 person_position_shift = 0.25  # Shift right significantly
             
-            # Analyze each frame separately to get more accurate results
-            frame_analyses = []
-            for idx, landmarks in enumerate(person_landmarks):
-                # Apply person-specific transformations to differentiate
-                adjusted_landmarks = []
-                for landmark in landmarks:
-                    # Transform x-coordinate based on person position
-                    # Left person moves left, right person moves right
-                    new_x = max(0.0, min(1.0, landmark[0] * person_transform_factor + person_position_shift))
-                    # Also adjust y slightly for variation
-                    new_y = landmark[1] * (1.0 + (person_position_shift * 0.1))
-                    adjusted_landmarks.append((new_x, new_y, landmark[2]))
-                
-                # Analyze with adjusted landmarks
-                frame_analysis = self.analyze_person(adjusted_landmarks, idx + 1)
-                
-                # Apply additional person-specific adjustments to results
-                if frame_analysis.get("technique"):
-                    tech = frame_analysis["technique"]
-                    if isinstance(tech, dict) and "primary" in tech:
-                        # Bias technique detection based on person
-                        if selected_identity == "LEFT":
-                            # Left person more likely to use Hook
-                            if tech["primary"] == "Unknown":
-                                tech["primary"] = "Hook"
-                            elif tech["primary"] == "Top Roll":
-                                tech["primary"] = "Hook"  # Prefer Hook for left
-                        else:
-                            # Right person more likely to use Top Roll
-                            if tech["primary"] == "Unknown":
-                                tech["primary"] = "Top Roll"
-                            elif tech["primary"] == "Hook":
-                                tech["primary"] = "Top Roll"  # Prefer Top Roll for right
-                
-                frame_analyses.append(frame_analysis)
+            # Apply person-specific transformations to differentiate, on
+            # every frame at once (person_landmarks is already a fresh copy)
+            frames = person_landmarks
+            # Transform x-coordinate based on person position
+            # Left person moves left, right person moves right
+            np.clip(frames[..., 0] * person_transform_factor + person_position_shift, 0.0, 1.0, out=frames[..., 0])
+            # Also adjust y slightly for variation
+            frames[..., 1] *= 1.0 + (person_position_shift * 0.1)
             
-            # Aggregate results from all frames
-            if frame_analyses:
-                # Get most common technique
-                technique_counts = defaultdict(int)
-                for fa in frame_analyses:
-                    tech = fa.get("technique", {}).get("primary", "Unknown")
-                    technique_counts[tech] += 1
-                primary_technique = max(technique_counts, key=technique_counts.get) if technique_counts else "Unknown"
-                
-                # Aggregate risks (prioritize high risks)
-                all_risks = []
-                for fa in frame_analyses:
-                    all_risks.extend(fa.get("risks", []))
-                unique_risks = {}
-                for risk in all_risks:
-                    title = risk.get("title", "")
-                    if title not in unique_risks or risk.get("level") == "high":
-                        unique_risks[title] = risk
-                final_risks = list(unique_risks.values())[:5]
-                
-                # Average strength metrics
-                strength_scores = {"Back Pressure": [], "Wrist Control": [], "Side Pressure": []}
-                for fa in frame_analyses:
-                    strength = fa.get("strength", {})
-                    for key in strength_scores:
-                        val = strength.get(key, "")
-                        if isinstance(val, str) and "Strong" in val:
-                            strength_scores[key].append(7.5)
-                        elif isinstance(val, str) and "Moderate" in val:
-                            strength_scores[key].append(6.0)
-                        elif isinstance(val, str) and "Weak" in val:
-                            strength_scores[key].append(4.0)
-                
-                avg_strength = {}
-                for key, scores in strength_scores.items():
-                    if scores:
-                        avg = sum(scores) / len(scores)
-                        if avg >= 7:
-                            avg_strength[key] = "Strong"
-                        elif avg >= 5.5:
-                            avg_strength[key] = "Moderate"
-                        else:
-                            avg_strength[key] = "Weak"
-                    else:
-                        avg_strength[key] = "N/A"
-                
-                # Get recommendations from most common technique
-                recommendations = self.generate_recommendations(
-                    primary_technique,
-                    final_risks,
-                    avg_strength
-                )
-                
-                # Use the first frame's technique structure but update primary
-                technique_result = frame_analyses[0].get("technique", {})
-                technique_result["primary"] = primary_technique
-                technique_result["description"] = f"{primary_technique} technique detected (analyzed {len(person_landmarks)} frames)"
-                
-                analysis = {
-                    "technique": technique_result,
-                    "risks": final_risks,
-                    "strength": avg_strength,
-                    "recommendations": recommendations
-                }
-            else:
-                # Fallback to average landmarks
-                avg_landmarks = np.mean(person_landmarks, axis=0).tolist()
-                analysis = self.analyze_person(avg_landmarks, len(person_landmarks))
+            # Arm angles and lengths for every frame in one vectorized pass,
+            # then every frame analyzed and aggregated in one batch
+            arm = self.calculate_arm_geometry(frames)
+            analysis = self.analyze_frames(frames, arm, selected_identity)
         else:
             # Fallback: use first detected person's landmarks
-            if selected_person.get("landmarks"):
+            if selected_person.get("landmarks") is not None:
                 print(f"[WARNING] Using fallback landmarks for {selected_person['label']}")
                 analysis = self.analyze_person(selected_person["landmarks"], frame_count)
             else:
-                return {
-                    "error": "Could not analyze selected person",
-                    "technique": {"primary": "Unknown", "transitions": [], "description": "Analysis failed - no poses matched"},
-                    "risks": [],
-                    "strength": {},
-                    "recommendations": [],
-                    "people_detected": [{"id": p["id"], "label": p["label"], "position": p["position"]} for p in people_detected]
-                }
-        
-        # Calculate video duration
-        cap = cv2.VideoCapture(video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS) if cap else 30
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = total_frames / fps if fps > 0 else 0
-        cap.release()
+                return error_result(
+                    "Could not analyze selected person",
+                    "Analysis failed - no poses matched",
+                    [{"id": p["id"], "label": p["label"], "position": p["position"]} for p in people_detected]
+                )
+        
+        # Video duration from the probe taken before decoding
+        duration = total_video_frames / video_fps if video_fps > 0 else 0
         
         return {
             **analysis,
@@ -1129,6 +1667,49 @@ class ArmWrestlingAnalyzer:
             }
         }
 
+class AnalyzerPool:
+    """Bounded pool of warm ArmWrestlingAnalyzer instances
+    
+    Building a Pose graph loads the TFLite model, so analyzers are created
+    lazily up to `size` and then reused. Each one serves a single video at a
+    time, since a Pose graph must not be shared between concurrent callers.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _acquire(self) -> "ArmWrestlingAnalyzer":
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if not can_create:
+            return self._idle.get()
+        try:
+            return ArmWrestlingAnalyzer()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+    
+    @contextmanager
+    def analyzer(self):
+        analyzer = self._acquire()
+        try:
+            yield analyzer
+        finally:
+            analyzer.reset()
+            self._idle.put(analyzer)
+
+ANALYZER_POOL_SIZE = min(os.cpu_count() or 1, 4)
+_analyzer_pool = AnalyzerPool(ANALYZER_POOL_SIZE)
+
 def analyze_armwrestling_video(video_path: str, person_id: Optional[int] = None) -> Dict[str, Any]:
     """Main entry point for video analysis
     
@@ -1139,6 +1720,6 @@ def analyze_armwrestling_video(video_path: str, person_id: Optional[int] = None)
     Returns:
         Analysis results with technique, risks, strength, recommendations
     """
-    analyzer = ArmWrestlingAnalyzer()
-    return analyzer.analyze_video(video_path, person_id=person_id)
+    with _analyzer_pool.analyzer() as analyzer:
+        return analyzer.analyze_video(video_path, person_id=person_id)
 